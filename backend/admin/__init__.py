@@ -4,12 +4,15 @@ from flask import session, redirect, url_for
 import inspect
 from .views import PostView, UserView
 
-def init_admin(app, collection, user_collection, admin_required, moderator_required=None):
+def init_admin(app, collection, user_collection, admin_required, moderator_required=None, on_posts_changed=None):
     """Initialize Flask-Admin with protected index view and fallback for older flask-admin versions.
 
     Some deployment environments may have an older flask-admin package where ``Admin.__init__``
     does not accept ``template_mode`` (and possibly ``base_template``). To keep the app
     resilient, we detect supported kwargs and only pass what the installed version supports.
+
+    ``on_posts_changed`` is called after a moderator creates, edits or deletes a post so the
+    public API can drop cached listings.
     """
 
     class ProtectedAdminIndexView(AdminIndexView):
@@ -52,7 +55,7 @@ def init_admin(app, collection, user_collection, admin_required, moderator_requi
     admin = Admin(app, **admin_kwargs)
 
     # Add PostView and UserView
-    admin.add_view(PostView(collection, 'Posts', endpoint='postview'))
+    admin.add_view(PostView(collection, 'Posts', endpoint='postview', on_posts_changed=on_posts_changed))
     admin.add_view(UserView(user_collection, 'Users', endpoint='userview'))  # Pass user_collection here
 
     return admin
\ No newline at end of file
@@ -1,8 +1,12 @@
 from flask import session, redirect, url_for, request, render_template
 from werkzeug.security import generate_password_hash, check_password_hash
 from functools import wraps
+import logging
 import re
-import time
+
+from cache import CacheUnavailable, MemoryBackend
+
+logger = logging.getLogger(__name__)
 
 def validate_password_complexity(password):
     """
@@ -30,10 +34,13 @@ def validate_password_complexity(password):
     
     return True, 'Password meets complexity requirements'
 
-def init_auth(app, user_collection):
-    # Very small in-memory rate limiter for the admin login endpoint.
-    # (Works best for single-instance deployments; for multi-instance use a shared store.)
-    login_failures = {}
+def init_auth(app, user_collection, state_backend=None):
+    # Small rate limiter for the admin login endpoint. Failure counters and lockouts live in
+    # ``state_backend`` (see cache.py); pass a Redis backend so every worker enforces the same lockout.
+    # It must not evict entries early (keep it apart from response caches), and when it is
+    # unreachable (CacheUnavailable) logins are refused rather than left unlimited.
+    if state_backend is None:
+        state_backend = MemoryBackend(max_entries=None)
     max_attempts = int(app.config.get('LOGIN_MAX_ATTEMPTS', 10))
     window_seconds = int(app.config.get('LOGIN_WINDOW_SECONDS', 15 * 60))
     lock_seconds = int(app.config.get('LOGIN_LOCK_SECONDS', 15 * 60))
@@ -45,24 +52,26 @@ def init_auth(app, user_collection):
         return request.remote_addr or 'unknown'
 
     def _is_locked(ip: str) -> bool:
-        entry = login_failures.get(ip)
-        if not entry:
-            return False
-        return entry.get('locked_until', 0) > time.time()
+        try:
+            return state_backend.get(f'login_lock:{ip}') is not None
+        except CacheUnavailable as e:
+            logger.warning('Login rate limit state unavailable, refusing login: %s', e)
+            return True
 
     def _register_failure(ip: str):
-        now = time.time()
-        entry = login_failures.get(ip)
-        if not entry or (now - entry.get('first_ts', now)) > window_seconds:
-            entry = {'first_ts': now, 'count': 0, 'locked_until': 0}
-
-        entry['count'] = entry.get('count', 0) + 1
-        if entry['count'] >= max_attempts:
-            entry['locked_until'] = now + lock_seconds
-        login_failures[ip] = entry
+        try:
+            count = state_backend.incr(f'login_failures:{ip}', window_seconds)
+            if count >= max_attempts:
+                state_backend.set(f'login_lock:{ip}', b'1', lock_seconds)
+        except CacheUnavailable as e:
+            logger.warning('Could not record failed login: %s', e)
 
     def _clear_failures(ip: str):
-        login_failures.pop(ip, None)
+        try:
+            state_backend.delete(f'login_failures:{ip}')
+            state_backend.delete(f'login_lock:{ip}')
+        except CacheUnavailable as e:
+            logger.warning('Could not clear failed logins: %s', e)
 
     # User creation helper
     def create_user(username, password, role):
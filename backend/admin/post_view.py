@@ -1,8 +1,26 @@
+import datetime
+from typing import Optional
+from urllib.parse import parse_qsl, urlsplit
+import pymongo
+from flask_admin.actions import action
 from flask_admin.contrib.pymongo import ModelView
 from flask_admin.contrib.pymongo.filters import FilterEqual, FilterNotEqual, FilterLike, FilterGreater, FilterSmaller
 from markupsafe import Markup
+from werkzeug.datastructures import MultiDict
 from .forms import PostForm
-from flask import session, redirect, url_for
+from flask import session, redirect, url_for, flash, request
+
+# Tags a moderator may retag selected posts with (the edit form's choices)
+RETAG_CHOICES = [value for value, _ in PostForm.tag.kwargs['choices']]
+
+# Secondary sort keys per sortable column, in the order of the index that serves the sort
+SORT_TIE_BREAKERS = {
+    'created_at': [('_id', pymongo.ASCENDING)],  # created
+    'title': [('_id', pymongo.ASCENDING)],  # title_id
+    'status': [('created_at', pymongo.DESCENDING), ('_id', pymongo.DESCENDING)],  # status_created
+}
+# List pages starting this deep are located through the index before documents are fetched
+DEEP_PAGE_SKIP = 1000
 
 class PostView(ModelView):
     def is_accessible(self):
@@ -36,11 +54,23 @@ class PostView(ModelView):
     column_labels = {
         'content_image_display': 'Image',
         'content_description': 'Description',
-        'story_prompt': 'Story Prompt'
+        'story_prompt': 'Story Prompt',
+        'content.description': 'Description'
     }
     
-    # Sortable columns
+    # Sortable columns; newest first unless another sort is chosen
     column_sortable_list = ('title', 'created_at', 'status')
+    column_default_sort = ('created_at', True)
+
+    # Search box: words in the title, description or optional tags ($text, see _search)
+    column_searchable_list = ('title', 'content.description')
+
+    # Filters (see scaffold_filters); the batch actions can also apply to everything they match
+    column_filters = ('title', 'tag', 'status', 'created_at', 'story_prompt')
+
+    # Adds the "all matching" switch and the retag picker to the actions menu
+    list_template = 'admin/model/post_list.html'
+    retag_choices = RETAG_CHOICES
     
     # Use our custom form
     form = PostForm
@@ -48,8 +78,10 @@ class PostView(ModelView):
     # Format the image display using a formatter function
     def _image_formatter(view, context, model, name):
         from markupsafe import escape
-        if model.get('content', {}).get('image'):
-            image_url = escape(model["content"]["image"])
+        content = model.get('content', {})
+        if content.get('image'):
+            # Prefer the small thumbnail generated on upload for the 100px preview.
+            image_url = escape(content.get('thumbnail') or content['image'])
             return Markup(
                 f'<img src="{image_url}" style="max-width: 100px; max-height: 100px;">'
             )
@@ -77,8 +109,150 @@ class PostView(ModelView):
         'optionalTags': _optional_tags_formatter
     }
 
-    def __init__(self, collection, name=None, category=None, endpoint=None, url=None, static_folder=None):
+    def __init__(self, collection, name=None, category=None, endpoint=None, url=None, static_folder=None, on_posts_changed=None):
         super(PostView, self).__init__(collection, name, category, endpoint, url, static_folder)
+        self.on_posts_changed = on_posts_changed
+
+    def _notify_posts_changed(self):
+        if self.on_posts_changed is not None:
+            self.on_posts_changed()
+
+    def after_model_change(self, form, model, is_created):
+        self._notify_posts_changed()
+
+    def after_model_delete(self, model):
+        self._notify_posts_changed()
+
+    # List queries: $text search, index-backed sorts, cheap counts and deep pages without a document skip
+    def _build_list_query(self, filters, search: Optional[str]) -> dict:
+        data = []
+        for index, _, value in filters or []:
+            flt = self._filters[index]
+            data = flt.apply(data, flt.clean(value))
+        query = self.get_query()
+        if len(data) == 1:
+            query = data[0]
+        elif data:
+            query['$and'] = data
+        if search:
+            query = self._search(query, search)
+        return query
+
+    def _search(self, query: dict, search_term: str) -> dict:
+        """Match words in the title, description or optional tags through the story_text index."""
+        search_term = search_term.strip()
+        if not search_term:
+            return query
+        text = {'$text': {'$search': search_term}}
+        return {'$and': [query, text]} if query else text
+
+    def _list_sort(self, sort_column: Optional[str], sort_desc: bool) -> list:
+        if not sort_column:
+            sort_column, sort_desc = self.column_default_sort
+        direction = pymongo.DESCENDING if sort_desc else pymongo.ASCENDING
+        # Tie-breakers make pages stable; they follow the supporting index (indexes.py), reversed
+        # together with it, so the sort is always read from the index.
+        tie_breakers = SORT_TIE_BREAKERS.get(sort_column, [('_id', pymongo.ASCENDING)])
+        return [(sort_column, direction)] + [(field, order * direction) for field, order in tie_breakers]
+
+    def get_list(self, page, sort_column, sort_desc, search, filters, execute=True, page_size=None):
+        query = self._build_list_query(filters, search)
+
+        if self.simple_list_pager:
+            count = None
+        elif not query:
+            # Unfiltered: read the count from collection metadata instead of scanning the index.
+            count = self.coll.estimated_document_count()
+        else:
+            count = self.coll.count_documents(query)
+
+        sort = self._list_sort(sort_column, sort_desc)
+        if page_size is None:
+            page_size = self.page_size
+        skip = page * page_size if page and page_size else 0
+
+        if page_size and skip >= DEEP_PAGE_SKIP:
+            # Skip with an _id-only projection, then fetch just this page's documents. The skip is
+            # index-only when one index serves both the filter and the sort (no filter, or a
+            # status / tag / story prompt equality filter under the default sort; see indexes.py).
+            # Other combinations still fetch each skipped document to apply the filter, but never
+            # return it.
+            ids = [doc['_id'] for doc in self.coll.find(query, {'_id': 1}, sort=sort, skip=skip, limit=page_size)]
+            by_id = {doc['_id']: doc for doc in self.coll.find({'_id': {'$in': ids}})}
+            return count, [by_id[pk] for pk in ids if pk in by_id]
+
+        results = self.coll.find(query, sort=sort, skip=skip, limit=page_size)
+        if execute:
+            return count, list(results)
+        return count, results
+
+    # Batch actions: one update_many/delete_many over the selection instead of a form per post
+    def _filter_query(self, args) -> dict:
+        """Rebuild the list view's query from its URL arguments (``flt<pos>_<key>=value`` and ``search``).
+
+        Raises ValueError for an unknown or invalid filter, or when neither a filter nor a search is applied.
+        """
+        applied = []
+        for arg, value in args.items():
+            if not arg.startswith('flt') or '_' not in arg:
+                continue
+            pos, key = arg[3:].split('_', 1)
+            if not self._filter_args or key not in self._filter_args:
+                raise ValueError(f'Unknown filter {arg}.')
+            index, flt = self._filter_args[key]
+            if not flt.validate(value):
+                raise ValueError(self.get_invalid_value_msg(value, flt))
+            applied.append((pos, (index, flt.name, value)))
+        search = args.get('search', '').strip()
+        if not applied and not search:
+            # Never let "all matching" silently mean the whole collection.
+            raise ValueError('Apply at least one filter or search before acting on all matching posts.')
+        return self._build_list_query([item for _, item in sorted(applied)], search)
+
+    def _selection_query(self, ids) -> dict:
+        """The checked rows, or every post matching the list's current filters when the
+        "all matching" switch was on (the list URL is posted back as the form's ``url``)."""
+        if request.form.get('select_all_matching') == '1':
+            return self._filter_query(MultiDict(parse_qsl(urlsplit(request.form.get('url', '')).query)))
+        return {'_id': {'$in': [self._get_valid_id(pk) for pk in ids]}}
+
+    def _update_selection(self, ids, changes: dict, done_message: str):
+        try:
+            changes = dict(changes, updated_at=datetime.datetime.now(datetime.timezone.utc))
+            result = self.coll.update_many(self._selection_query(ids), {'$set': changes})
+        except Exception as ex:
+            flash(f'Failed to update posts. {ex}', 'error')
+            return
+        if result.modified_count:
+            self._notify_posts_changed()
+        flash(f'{result.modified_count} post(s) {done_message}.', 'success')
+
+    @action('approve', 'Approve', 'Approve the selected posts?')
+    def action_approve(self, ids):
+        self._update_selection(ids, {'status': 'approved'}, 'approved')
+
+    @action('reject', 'Reject', 'Reject the selected posts?')
+    def action_reject(self, ids):
+        self._update_selection(ids, {'status': 'rejected'}, 'rejected')
+
+    @action('retag', 'Retag', 'Change the tag of the selected posts?')
+    def action_retag(self, ids):
+        tag = request.form.get('retag_tag')
+        if tag not in RETAG_CHOICES:
+            flash('Choose a tag to retag the selected posts with.', 'error')
+            return
+        self._update_selection(ids, {'tag': tag}, f'retagged as {tag}')
+
+    @action('delete', 'Delete', 'Are you sure you want to delete the selected posts?')
+    def action_delete(self, ids):
+        try:
+            result = self.coll.delete_many(self._selection_query(ids))
+        except Exception as ex:
+            flash(f'Failed to delete posts. {ex}', 'error')
+            return
+        if result.deleted_count:
+            self._notify_posts_changed()
+        flash(f'{result.deleted_count} post(s) deleted.', 'success')
 
     def on_model_change(self, form, model, is_created):        
         # Handle optionalTags - convert from string to list
@@ -88,10 +262,14 @@ class PostView(ModelView):
             del model['optionalTags']
         
         # Create content dictionary
+        previous_content = model.get('content') if isinstance(model.get('content'), dict) else {}
         model['content'] = {
             'description': form.content_description.data,
             'image': form.content_image.data if form.content_image.data else None
         }
+        # Keep the generated thumbnail only while it still belongs to the same image
+        if previous_content.get('thumbnail') and previous_content.get('image') == model['content']['image']:
+            model['content']['thumbnail'] = previous_content['thumbnail']
         
         # Create location dictionary
         model['location'] = {
@@ -101,6 +279,9 @@ class PostView(ModelView):
 
         # Story prompt
         model['story_prompt'] = form.story_prompt.data if form.story_prompt.data else None
+
+        # Track edits so the public API can revalidate cached copies (ETag)
+        model['updated_at'] = datetime.datetime.now(datetime.timezone.utc)
         
         # Remove temporary fields
         fields_to_remove = [
@@ -1,22 +1,44 @@
 import requests
 import datetime
-from flask import Flask, jsonify, request, session, send_from_directory
+from flask import Flask, jsonify, request, session, stream_with_context, g
 from swagger import init_swagger
+from cache import ResponseCache, create_backend
+from compression import accepted_encoding, init_compression, send_static_file
+from boundary import BoundaryStore, default_source_path
+from streaming import iter_json_array, iter_ndjson
+from image_jobs import ImageUploadQueue
+from indexes import ensure_indexes
+from queries import MAX_BBOX_LATITUDE, POSTS_SORT, bbox_to_geometry, build_cluster_pipeline, build_post_query, keyset_filter
+from image_processing import ImageRejected, ProcessedImage, check_image, process_image
+from http_client import HttpClient
+from metrics import MongoCommandListener, init_metrics, observe_external_call, render_metrics
+from structured_logging import init_logging
+from captcha import create_verifier
+from grace_tokens import GraceTokenSigner, client_fingerprint
+from schemas import PostSchema, TagSchema
+from ingest import IMPORT_FORMATS, detect_format, ingest_rows, parse_rows, text_lines
+from export import EXPORT_FORMATS, EXPORT_MIMETYPES, POST_FIELD_STORAGE, find_for_export, iter_export, serialize_post
 from flask_pymongo import PyMongo
 from bson.objectid import ObjectId
-from marshmallow import Schema, fields, ValidationError, validate
+from marshmallow import Schema, fields, ValidationError, validate, validates_schema
+from pymongo.errors import OperationFailure, PyMongoError
 from flask_cors import CORS
 import os
 import json
 import hashlib
+import hmac
+import logging
+import base64
+import threading
 from typing import Optional
 
-from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
 
 from admin.auth import init_auth
 from admin import init_admin
 
-app = Flask(__name__, static_folder="static", static_url_path="/")
+# The built React app is served by the index/static_files routes below (not Flask's built-in
+# static view) so precompressed .br/.gz siblings can be used.
+app = Flask(__name__, static_folder=None)
 init_swagger(app)
 
 # Check if running locally
@@ -70,14 +92,52 @@ def _get_int_env(name: str, default: int) -> int:
     except ValueError:
         return default
 
+def _get_float_env(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if raw is None or raw == '':
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return default
+
 captcha_grace_seconds = max(0, _get_int_env('CAPTCHA_GRACE_SECONDS', 300))
 
+# JSON logs written from a background thread, with request IDs; LOG_REQUEST_SAMPLE_RATE is the
+# share of successful requests that get an access-log line (5xx responses are always logged).
+init_logging(app, level=os.getenv('LOG_LEVEL', 'INFO'), request_sample_rate=_get_float_env('LOG_REQUEST_SAMPLE_RATE', 0.0))
+logger = logging.getLogger('app')
+# Share of client-error events (validation / CAPTCHA failures) that are logged; bots can make these high-volume.
+CLIENT_ERROR_LOG_SAMPLE_RATE = 0.1
+
+# Per-route latency/size/Mongo/outbound timings for /metrics. Registered before compression so
+# its after_request hook runs last and sees the compressed body size.
+init_metrics(app)
+
+# gzip/brotli for JSON API responses; static assets use build-time .br/.gz siblings instead.
+init_compression(app, min_size=_get_int_env('COMPRESSION_MIN_BYTES', 1024))
+
+# Shared cache backend: in-process by default, Redis when CACHE_URL=redis://... so every
+# gunicorn worker sees the same listing cache.
+cache_backend = create_backend(
+    os.getenv('CACHE_URL'),
+    max_entries=_get_int_env('CACHE_MAX_ENTRIES', 1024),
+    max_bytes=_get_int_env('CACHE_MAX_BYTES', 32 * 1024 * 1024),
+)
+# Login rate-limit state gets its own store: never evicted by listing-cache churn, and strict,
+# so an unreachable Redis refuses logins instead of disabling the lockout.
+rate_limit_backend = create_backend(os.getenv('CACHE_URL'), max_entries=None, strict=True)
+
+# Serialized GET /api/posts responses, keyed by the stories version and invalidated by every
+# write path. Set POSTS_CACHE_TTL_SECONDS=0 to disable.
+posts_cache = ResponseCache(cache_backend, 'posts', ttl_seconds=_get_int_env('POSTS_CACHE_TTL_SECONDS', 60))
+
 # Configure MongoDB and Flask session
 app.config["MONGO_URI"] = mongo_uri
 if not secret_key:
     if debug_mode:
         secret_key = 'dev-insecure-secret-key'
-        print('WARNING: SECRET_KEY not set; using insecure development default')
+        logger.warning('SECRET_KEY not set; using insecure development default')
     else:
         raise RuntimeError('SECRET_KEY environment variable must be set')
 
@@ -87,7 +147,7 @@ app.config['SESSION_COOKIE_HTTPONLY'] = True
 app.config['SESSION_COOKIE_SAMESITE'] = os.getenv('SESSION_COOKIE_SAMESITE', 'Lax')
 app.config['SESSION_COOKIE_SECURE'] = os.getenv('SESSION_COOKIE_SECURE', 'True' if not debug_mode else 'False').lower() == 'true'
 
-captcha_grace_serializer = URLSafeTimedSerializer(app.config['SECRET_KEY'], salt='captcha-grace-v1')
+captcha_grace_signer = GraceTokenSigner(app.config['SECRET_KEY'], captcha_grace_seconds)
 
 def _get_client_ip() -> str:
     # Prefer the first IP in X-Forwarded-For when behind a proxy.
@@ -96,44 +156,83 @@ def _get_client_ip() -> str:
         return forwarded_for.split(',')[0].strip()
     return request.remote_addr or ''
 
-def _get_user_agent_hash() -> str:
-    ua = request.headers.get('User-Agent', '')
-    return hashlib.sha256(ua.encode('utf-8')).hexdigest()
+def _get_client_fingerprint() -> bytes:
+    # Computed once per request; both validating and minting a grace token need it.
+    if 'client_fingerprint' not in g:
+        g.client_fingerprint = client_fingerprint(_get_client_ip(), request.headers.get('User-Agent', ''))
+    return g.client_fingerprint
 
 def _make_captcha_grace_token() -> str:
-    payload = {
-        'ip': _get_client_ip(),
-        'ua': _get_user_agent_hash(),
-    }
-    return captcha_grace_serializer.dumps(payload)
+    return captcha_grace_signer.make(_get_client_fingerprint())
 
 def _is_valid_captcha_grace_token(token: Optional[str]) -> bool:
-    if not token or captcha_grace_seconds <= 0:
-        return False
+    return captcha_grace_signer.is_valid(token, _get_client_fingerprint())
 
-    try:
-        payload = captcha_grace_serializer.loads(token, max_age=captcha_grace_seconds)
-    except (SignatureExpired, BadSignature):
-        return False
-
-    return payload.get('ip') == _get_client_ip() and payload.get('ua') == _get_user_agent_hash()
-mongo = PyMongo(app)
+mongo = PyMongo(app, event_listeners=[MongoCommandListener()])
 collection = mongo.db.stories
 user_collection = mongo.db.users
+# One small document per tracked collection; its version is bumped by every write path so
+# GET /api/posts can answer conditional requests without querying the stories collection.
+versions_collection = mongo.db.collection_versions
+
+def _mark_posts_changed():
+    """Bump the stories version and drop cached listings after any story write."""
+    try:
+        versions_collection.update_one(
+            {'_id': 'stories'},
+            {'$inc': {'version': 1}, '$currentDate': {'updated_at': True}},
+            upsert=True,
+        )
+    except PyMongoError as e:
+        logger.warning('Could not bump stories version', extra={'error': str(e)})
+    posts_cache.invalidate()
+
+def _get_posts_version() -> dict:
+    return versions_collection.find_one({'_id': 'stories'}) or {'version': 0, 'updated_at': None}
+
+# Create the indexes the listing, geo, login and image-job queries rely on (see indexes.py).
+# Idempotent, so every worker may run it; AUTO_CREATE_INDEXES=false leaves it to `python indexes.py`.
+# Runs in the background so an unreachable MongoDB cannot hold up worker boot.
+if os.getenv('AUTO_CREATE_INDEXES', 'true').lower() == 'true':
+    threading.Thread(target=ensure_indexes, args=(mongo.db,), name='ensure-indexes', daemon=True).start()
 
 # Initialize authentication and admin logic
-auth = init_auth(app, user_collection)
-init_admin(app, collection, user_collection, auth['admin_required'], auth['moderator_required'])
+auth = init_auth(app, user_collection, state_backend=rate_limit_backend)
+init_admin(
+    app,
+    collection,
+    user_collection,
+    auth['admin_required'],
+    auth['moderator_required'],
+    on_posts_changed=_mark_posts_changed,
+)
 
 # Route to serve the React app
 @app.route('/')
 def index():
-    return send_from_directory(os.path.join(app.root_path, 'static'), 'index.html')
+    return send_static_file(os.path.join(app.root_path, 'static'), 'index.html')
 
 # Route to serve static files (JS, CSS, images, etc.)
 @app.route('/<path:path>')
 def static_files(path):
-    return send_from_directory(os.path.join(app.root_path, 'static'), path)
+    return send_static_file(os.path.join(app.root_path, 'static'), path)
+
+# Simplified Canada outline per zoom level (see boundary.py), cached in memory and on disk
+boundary_store = BoundaryStore(
+    os.getenv('BOUNDARY_GEOJSON_PATH') or default_source_path(app.root_path),
+    os.getenv('BOUNDARY_CACHE_DIR') or os.path.join(app.root_path, 'boundary_cache'),
+)
+
+# Prometheus scrape endpoint: an admin session, or `Authorization: Bearer $METRICS_TOKEN` for scrapers.
+metrics_token = os.getenv('METRICS_TOKEN')
+_admin_metrics = auth['admin_required'](render_metrics)
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    authorization = request.headers.get('Authorization', '').encode('utf-8')
+    if metrics_token and hmac.compare_digest(authorization, f'Bearer {metrics_token}'.encode('utf-8')):
+        return render_metrics()
+    return _admin_metrics()
 
 # Use the login_required decorator where needed
 @app.route('/protected')
@@ -141,100 +240,188 @@ def static_files(path):
 def protected_route():
     return 'This is a protected route.'
 
-# Define the schema for input validation using Marshmallow
-STORY_PROMPTS = [
-    'A moment that stayed with me',
-    "A change I've noticed over time",
-    "A challenge I'm facing",
-    'Something I lost',
-    "Something I'm protecting",
-    "Something I'm proud of",
-    'A solution I believe in',
-    'A question I have',
-    'Lived experience / One-time event',
-    'Personal action I took',
-    'Community action',
-    "Something I'm worried about",
-    'Something that gives me hope',
-]
-
-class PostSchema(Schema):
-    title = fields.Str(required=True)
-    content = fields.Dict(required=True)
-    location = fields.Dict(required=True)
-    tag = fields.Str(
-        required=True,
-        validate=validate.OneOf(
-            [
-                # Emotion tags
-                'Anxious',
-                'Overwhelmed',
-                'Hopeful',
-                'Empowered',
-                'Frustrated',
-                'Angry',
-                'Concerned',
-                'Sad/Grief',
-                'Motivated',
-                'Inspired',
-                'Determined',
-                'Resilient',
-                'Fearful',
-                'Curious',
-                # Legacy tags (backward compatibility)
-                'Positive',
-                'Neutral',
-                'Negative',
-            ]
-        ),
-    )
-    optionalTags = fields.List(fields.Str(), required=False, load_default=[]) # Make optional for backward compatibility
-    storyPrompt = fields.Str(required=False, allow_none=True, load_default=None, validate=validate.OneOf(STORY_PROMPTS))
-    captchaToken = fields.Str(required=False, allow_none=True, load_default=None)  # Required unless a grace token is provided
-    captchaGraceToken = fields.Str(required=False, allow_none=True, load_default=None)
-    createdAt = fields.DateTime()
-    status = fields.Str(required=False, load_default='pending')
-
-# Define a schema for tag validation
-class TagSchema(Schema):
-    tag = fields.Str(
-        required=False,
-        allow_none=True,
-        validate=validate.OneOf(
-            [
-                # Emotion tags
-                'Anxious',
-                'Overwhelmed',
-                'Hopeful',
-                'Empowered',
-                'Frustrated',
-                'Angry',
-                'Concerned',
-                'Sad/Grief',
-                'Motivated',
-                'Inspired',
-                'Determined',
-                'Resilient',
-                'Fearful',
-                'Curious',
-                # Legacy tags (backward compatibility)
-                'Positive',
-                'Neutral',
-                'Negative',
-            ]
-        ),
-    )
-    optionalTags = fields.List(fields.Str(), required=False, load_default=[])
-    storyPrompt = fields.Str(required=False, allow_none=True, validate=validate.OneOf(STORY_PROMPTS))
+def _parse_coordinate_list(raw: str, expected: int, name: str) -> list:
+    parts = [part.strip() for part in raw.split(',')]
+    if len(parts) != expected:
+        raise ValidationError(f'{name} must contain {expected} comma-separated numbers', name)
+    try:
+        return [float(part) for part in parts]
+    except ValueError:
+        raise ValidationError(f'{name} must contain only numbers', name)
+
+# Zoom range of /api/posts/clusters (grid in queries.build_cluster_pipeline)
+MAX_CLUSTER_ZOOM = 22
+
+# Define a schema for the optional viewport (bbox) or center+radius filter
+class GeoQuerySchema(Schema):
+    bbox = fields.Str(required=False, allow_none=True)  # minLng,minLat,maxLng,maxLat
+    center = fields.Str(required=False, allow_none=True)  # lng,lat
+    radius = fields.Float(required=False, allow_none=True, validate=validate.Range(min=0, min_inclusive=False))  # meters
+
+    @validates_schema
+    def validate_geo(self, data, **kwargs):
+        bbox = data.get('bbox')
+        center = data.get('center')
+        radius = data.get('radius')
+        if bbox and (center or radius is not None):
+            raise ValidationError('Use either bbox or center+radius, not both', 'bbox')
+        if bool(center) != (radius is not None):
+            raise ValidationError('center and radius must be provided together', 'center')
+
+        if bbox:
+            min_lng, min_lat, max_lng, max_lat = _parse_coordinate_list(bbox, 4, 'bbox')
+            if not (-90 <= min_lat < max_lat <= 90):
+                raise ValidationError('bbox latitudes must satisfy -90 <= minLat < maxLat <= 90', 'bbox')
+            if min_lng >= max_lng:
+                raise ValidationError('bbox longitudes must satisfy minLng < maxLng', 'bbox')
+            if min_lat >= MAX_BBOX_LATITUDE or max_lat <= -MAX_BBOX_LATITUDE:
+                raise ValidationError(f'bbox must overlap latitudes -{MAX_BBOX_LATITUDE} to {MAX_BBOX_LATITUDE}', 'bbox')
+        if center:
+            lng, lat = _parse_coordinate_list(center, 2, 'center')
+            if not (-180 <= lng <= 180 and -90 <= lat <= 90):
+                raise ValidationError('center must be a valid lng,lat pair', 'center')
+
+# Define a schema for the simplified boundary endpoint
+class BoundaryQuerySchema(Schema):
+    zoom = fields.Int(required=False, load_default=4, validate=validate.Range(min=0, max=MAX_CLUSTER_ZOOM))
+
+# Define a schema for the server-side clustering endpoint (viewport only; $nearSphere is not allowed in $match)
+class ClusterQuerySchema(GeoQuerySchema):
+    zoom = fields.Int(required=True, validate=validate.Range(min=0, max=MAX_CLUSTER_ZOOM))
+
+    @validates_schema
+    def validate_bbox_only(self, data, **kwargs):
+        if data.get('center') or data.get('radius') is not None:
+            raise ValidationError('Clusters only support the bbox filter', 'center')
+
+# Keyset pagination for GET /api/posts
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Cursor batch size for streamed listings
+STREAM_BATCH_SIZE = 500
+
+class PageCursorField(fields.Field):
+    """Opaque base64 cursor holding the (created_at, _id) of the last post on the previous page."""
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        try:
+            created_at, last_id = json.loads(base64.urlsafe_b64decode(value.encode('ascii')))
+            if created_at is not None:
+                created_at = datetime.datetime.fromisoformat(created_at)
+            return [created_at, ObjectId(last_id)]
+        except Exception:
+            raise ValidationError('Invalid cursor')
+
+class FieldListField(fields.Field):
+    """Comma-separated list of API field names, e.g. ``fields=location,tag``."""
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in names if name not in POST_FIELD_STORAGE]
+        if unknown:
+            raise ValidationError(f"Unknown fields: {', '.join(unknown)}")
+        return names
+
+# Define a schema for pagination and field projection
+class PageQuerySchema(Schema):
+    limit = fields.Int(required=False, allow_none=True, validate=validate.Range(min=1, max=MAX_PAGE_SIZE))
+    cursor = PageCursorField(required=False, allow_none=True)
+    field_names = FieldListField(required=False, allow_none=True, data_key='fields')
+
+# Full-text search (GET /api/posts/search): ranked by relevance, paginated by offset
+DEFAULT_SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGE_SIZE = 100
+# Every match is scored before ranking, so paging stops this deep; refine the query instead
+MAX_SEARCH_RESULTS = 1000
+
+class SearchCursorField(fields.Field):
+    """Opaque base64 cursor holding the offset of the next page of ranked results."""
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        try:
+            offset = json.loads(base64.urlsafe_b64decode(value.encode('ascii')))
+        except Exception:
+            raise ValidationError('Invalid cursor')
+        if not isinstance(offset, int) or not 0 <= offset < MAX_SEARCH_RESULTS:
+            raise ValidationError('Invalid cursor')
+        return offset
+
+# Define a schema for story search (text query, optional viewport, page)
+class SearchQuerySchema(GeoQuerySchema):
+    q = fields.Str(required=True, validate=validate.Length(min=1, max=200))
+    limit = fields.Int(required=False, load_default=DEFAULT_SEARCH_PAGE_SIZE, validate=validate.Range(min=1, max=MAX_SEARCH_PAGE_SIZE))
+    cursor = SearchCursorField(required=False, load_default=0)
+
+    @validates_schema
+    def validate_search(self, data, **kwargs):
+        if not data.get('q', '').strip():
+            raise ValidationError('Search text must not be empty', 'q')
+        # $text cannot be combined with $nearSphere
+        if data.get('center') or data.get('radius') is not None:
+            raise ValidationError('Search only supports the bbox filter', 'center')
+
+# Define a schema for the data export (format and incremental since)
+class ExportQuerySchema(Schema):
+    format = fields.Str(required=False, load_default='geojson', validate=validate.OneOf(EXPORT_FORMATS))
+    since = fields.DateTime(required=False, allow_none=True)
 
 # Initialize the schema instance
 post_schema = PostSchema()
 tag_schema = TagSchema()
+geo_query_schema = GeoQuerySchema()
+page_query_schema = PageQuerySchema()
+cluster_query_schema = ClusterQuerySchema()
+boundary_query_schema = BoundaryQuerySchema()
+export_query_schema = ExportQuerySchema()
+search_query_schema = SearchQuerySchema()
+
+def _build_geo_filter(geo_args: dict) -> Optional[dict]:
+    """Translate validated bbox / center+radius arguments into a filter on ``location``."""
+    if geo_args.get('bbox'):
+        min_lng, min_lat, max_lng, max_lat = _parse_coordinate_list(geo_args['bbox'], 4, 'bbox')
+        return {'$geoWithin': {'$geometry': bbox_to_geometry(min_lng, min_lat, max_lng, max_lat)}}
+    if geo_args.get('center'):
+        lng, lat = _parse_coordinate_list(geo_args['center'], 2, 'center')
+        return {
+            '$nearSphere': {
+                '$geometry': {'type': 'Point', 'coordinates': [lng, lat]},
+                '$maxDistance': geo_args['radius'],
+            }
+        }
+    return None
+
+def _geo_query_error(query: dict, err: OperationFailure):
+    """400 response for a spatial filter MongoDB refused to plan; re-raises any other failure."""
+    if 'location' not in query:
+        raise err
+    logger.info('Spatial filter rejected', extra={'error': str(err), 'code': err.code})
+    return jsonify({'errors': {'location': ['The spatial filter is not a valid region']}}), 400
 # Swagger definition for Post
 # Swagger definition for Post
 
+# Pooled, timeout-bounded clients for third-party calls (see http_client.py)
+captcha_client = HttpClient('hcaptcha', read_timeout=_get_int_env('CAPTCHA_TIMEOUT_SECONDS', 5), on_complete=observe_external_call)
+cdn_client = HttpClient('imgbb', read_timeout=_get_int_env('CDN_TIMEOUT_SECONDS', 30), on_complete=observe_external_call)
+
+# CAPTCHA_VERIFIER=stub skips the hCaptcha round-trip entirely (load testing only)
+captcha_verifier_kind = os.getenv('CAPTCHA_VERIFIER', 'hcaptcha').strip().lower()
+if captcha_verifier_kind == 'stub':
+    logger.warning('CAPTCHA_VERIFIER=stub; every CAPTCHA token is accepted')
+captcha_verifier = create_verifier(
+    captcha_verifier_kind,
+    cache_backend,
+    cache_ttl_seconds=_get_int_env('CAPTCHA_VERIFY_CACHE_SECONDS', 120),
+    client=captcha_client,
+    url=captcha_url or 'https://hcaptcha.com/siteverify',
+    secret=captcha_secret_key,
+    stub_latency_ms=_get_int_env('CAPTCHA_STUB_LATENCY_MS', 0),
+)
+
 def upload_image_to_imgbb(image_file):
-    """Upload image to ImgBB and return the URL"""
+    """Upload image to ImgBB and return the URL
+
+    ``image_file`` is a file object or a ``(filename, bytes, content_type)`` tuple.
+    """
     try:
         files = {'image': image_file}
         data = {'key': cdn_key}
@@ -247,20 +434,65 @@ def upload_image_to_imgbb(image_file):
         if album_id:
             data['album'] = album_id
         
-        response = requests.post(cdn_url, files=files, data=data)
+        response = cdn_client.post(cdn_url, files=files, data=data)
         result = response.json()
         
-        print(f"ImgBB response: {result}")
-        
         if result.get('success'):
+            logger.debug('ImgBB upload succeeded', extra={'status': response.status_code, 'size': result['data'].get('size')})
             return result['data']['url']
         else:
-            print(f"ImgBB upload failed: {result.get('error', 'Unknown error')}")
+            logger.warning('ImgBB upload failed', extra={'status': response.status_code, 'error': result.get('error', 'Unknown error')})
             return None
     except Exception as e:
-        print(f"Error uploading image: {e}")
+        logger.warning('Error uploading image', extra={'error': str(e)})
         return None
 
+def upload_processed_image(processed: ProcessedImage) -> Optional[dict]:
+    """Upload a re-encoded image with its thumbnail.
+
+    Returns the ``content`` fields to store (``image`` and, when available, ``thumbnail``),
+    or None when the main image could not be uploaded.
+    """
+    image_url = upload_image_to_imgbb(processed.image)
+    if not image_url:
+        return None
+    content = {'image': image_url}
+    if processed.thumbnail is not None:
+        thumbnail_url = upload_image_to_imgbb(processed.thumbnail)
+        if thumbnail_url:
+            content['thumbnail'] = thumbnail_url
+    return content
+
+def upload_story_image(image: tuple) -> Optional[dict]:
+    """Re-encode an uploaded ``(filename, bytes, content_type)`` image and upload it (inline path).
+
+    Returns None when the image was rejected or could not be uploaded.
+    """
+    try:
+        processed = process_image(*image)
+    except ImageRejected as e:
+        # Never fall back to the original bytes: they still carry EXIF/GPS metadata.
+        logger.warning('Image rejected', extra={'error': str(e)})
+        return None
+    return upload_processed_image(processed)
+
+# Background CDN uploads for images attached to new stories (IMAGE_UPLOAD_WORKERS=0 uploads inline)
+image_upload_workers = max(0, _get_int_env('IMAGE_UPLOAD_WORKERS', 2))
+image_upload_queue = ImageUploadQueue(
+    mongo.db.image_jobs,
+    collection,
+    upload_processed_image,
+    on_complete=_mark_posts_changed,
+    process=process_image,
+    max_workers=max(1, image_upload_workers),
+    max_attempts=max(1, _get_int_env('IMAGE_UPLOAD_MAX_ATTEMPTS', 5)),
+)
+
+@app.before_request
+def _start_background_workers():
+    if image_upload_workers > 0 and cdn_key:
+        image_upload_queue.start()
+
 # CREATE (Insert a new document)
 # Route to create a new post document
 @app.route('/api/posts/create', methods=['POST'])
@@ -314,23 +546,27 @@ def create():
                 return jsonify({'success': False, 'message': 'CAPTCHA token missing', 'errorCode': 'captcha_required'}), 400
 
             # Verify the hCaptcha token
-            verification_response = requests.post(
-                captcha_url,
-                data={
-                    'secret': captcha_secret_key,
-                    'response': hcaptcha_response
-                }
-            )
-
-            verification_result = verification_response.json()
+            try:
+                verification_result = captcha_verifier.verify(hcaptcha_response, _get_client_fingerprint())
+            except (requests.RequestException, ValueError) as e:
+                logger.warning('CAPTCHA verification unavailable', extra={'error': str(e)})
+                return jsonify({
+                    'success': False,
+                    'message': 'CAPTCHA verification unavailable, please try again',
+                    'errorCode': 'captcha_unavailable',
+                }), 503
             if not verification_result.get('success'):
-                print(f"CAPTCHA verification failed: {verification_result}")
+                logger.info('CAPTCHA verification failed', extra={
+                    'error_codes': verification_result.get('error-codes'),
+                    'sample_rate': CLIENT_ERROR_LOG_SAMPLE_RATE,
+                })
                 return jsonify({'success': False, 'message': 'CAPTCHA verification failed'}), 400
 
             captcha_passed = True
             verified_via_captcha = True
 
         # Handle image upload if present
+        pending_image = None
         if 'image' in request.files:
             image_file = request.files['image']
             if image_file.filename:
@@ -346,16 +582,27 @@ def create():
                 image_file.seek(0)  # Reset to beginning
                 if file_size > 5 * 1024 * 1024:
                     return jsonify({'error': 'File too large. Maximum size is 5MB.'}), 400
+
+                # Header and dimensions only; the pixels are decoded when the image is re-encoded.
+                image_bytes = image_file.read()
+                try:
+                    check_image(image_bytes)
+                except ImageRejected as e:
+                    logger.info('Image rejected', extra={'error': str(e)})
+                    return jsonify({'error': 'Invalid image. Upload a JPEG, PNG, GIF or WebP of at most 50 megapixels.'}), 400
                 
                 if not cdn_key:
-                    print("CDN_KEY not configured, skipping image upload")
+                    logger.warning('CDN_KEY not configured, skipping image upload')
+                elif image_upload_workers > 0:
+                    # Save the story now; the CDN upload happens in the background.
+                    pending_image = (image_file.filename, image_file.mimetype, image_bytes)
+                    data['image_status'] = 'pending'
                 else:
-                    image_url = upload_image_to_imgbb(image_file)
-                    if image_url:
-                        data['content']['image'] = image_url
-                        print("Image uploaded successfully")
+                    uploaded = upload_story_image((image_file.filename, image_bytes, image_file.mimetype))
+                    if uploaded:
+                        data['content'].update(uploaded)
                     else:
-                        print("Failed to upload image to ImgBB, continuing without image")
+                        logger.warning('Failed to upload image to ImgBB, continuing without image')
 
         data['created_at'] = datetime.datetime.now(datetime.timezone.utc)
         data['status'] = 'approved' #TODO Temporary for alpha testing
@@ -366,8 +613,23 @@ def create():
             
         # Insert the data into the collection
         result = collection.insert_one(data)
+        _mark_posts_changed()
+        if verified_via_captcha:
+            captcha_verifier.forget(hcaptcha_response, _get_client_fingerprint())
 
         response_payload = {'message': 'Post created', 'post_id': str(result.inserted_id)}
+        if pending_image is not None:
+            try:
+                image_upload_queue.enqueue(result.inserted_id, *pending_image)
+                response_payload['imageStatus'] = 'pending'
+            except Exception:
+                # The story is already stored; never leave it pending with no job behind it.
+                logger.exception('Could not queue image upload', extra={'post_id': str(result.inserted_id)})
+                try:
+                    collection.update_one({'_id': result.inserted_id}, {'$set': {'image_status': 'failed'}})
+                except PyMongoError as update_error:
+                    logger.warning('Could not mark image upload failed', extra={'error': str(update_error)})
+                response_payload['imageStatus'] = 'failed'
         if not is_localhost and captcha_grace_seconds > 0 and verified_via_captcha:
             response_payload['captchaGraceToken'] = _make_captcha_grace_token()
             response_payload['captchaGraceExpiresInSeconds'] = captcha_grace_seconds
@@ -375,12 +637,129 @@ def create():
         return jsonify(response_payload), 201
     
     except ValidationError as err:
-        print(f"Validation error: {err.messages}")
+        logger.info('Post validation failed', extra={'errors': err.messages, 'sample_rate': CLIENT_ERROR_LOG_SAMPLE_RATE})
         return jsonify({'errors': err.messages}), 400
     except Exception as e:
-        print(f"Unexpected error: {str(e)}")
+        logger.exception('Unexpected error creating post')
         return jsonify({'error': str(e)}), 500
 
+# Bulk import of pre-moderated stories (NDJSON or CSV); the same code backs import_stories.py
+bulk_import_max_rows = max(1, _get_int_env('BULK_IMPORT_MAX_ROWS', 10000))
+
+@app.route('/api/posts/bulk', methods=['POST'])
+@auth['moderator_required']
+def bulk_create():
+    """
+    Import many stories at once (moderators only)
+    ---
+    consumes:
+      - application/x-ndjson
+      - text/csv
+      - multipart/form-data
+    parameters:
+      - name: body
+        in: body
+        required: false
+        description: NDJSON (one create-API post object per line) or CSV (title, description, image, longitude, latitude, tag, optionalTags separated by |, storyPrompt, createdAt, status)
+      - name: file
+        in: formData
+        type: file
+        required: false
+        description: Alternatively, upload the .ndjson/.csv file as multipart form data
+      - name: format
+        in: query
+        type: string
+        required: false
+        description: ndjson or csv; detected from the Content-Type or file name when omitted
+      - name: dryRun
+        in: query
+        type: boolean
+        required: false
+        description: Validate only; nothing is written
+    responses:
+      200:
+        description: '{inserted, errors: [{row, errors}]}; row is the NDJSON line or CSV data row (header excluded). status defaults to approved'
+      400:
+        description: Unknown format
+    """
+    upload = request.files.get('file')
+    if upload is not None:
+        stream, fmt = upload.stream, detect_format(upload.mimetype, upload.filename)
+    else:
+        stream, fmt = request.stream, detect_format(request.mimetype)
+    fmt = request.args.get('format', fmt)
+    if fmt not in IMPORT_FORMATS:
+        return jsonify({'errors': {'format': [f"Must be one of: {', '.join(IMPORT_FORMATS)}."]}}), 400
+    dry_run = request.args.get('dryRun', '').lower() in ('1', 'true')
+
+    result = ingest_rows(collection, parse_rows(text_lines(stream), fmt), max_rows=bulk_import_max_rows, dry_run=dry_run)
+    if result.inserted and not dry_run:
+        _mark_posts_changed()
+    logger.info('Bulk import', extra={'format': fmt, 'inserted': result.inserted, 'failed_rows': len(result.errors), 'dry_run': dry_run})
+    return jsonify({
+        'inserted': result.inserted,
+        'errors': [error._asdict() for error in result.errors],
+        'dryRun': dry_run,
+    }), 200
+
+def _load_post_filters() -> dict:
+    """Validate the tag/optionalTags/storyPrompt query args and build the base stories query."""
+    # Get single tag if provided
+    tag = request.args.get('tag')
+
+    # Get optional tags list if provided
+    raw_optional_tags = request.args.getlist('optionalTags')  # This returns a list directly
+
+    # Get story prompt if provided
+    story_prompt = request.args.get('storyPrompt')
+
+    # Validate and load filters
+    args = tag_schema.load({'tag': tag, 'optionalTags': raw_optional_tags, 'storyPrompt': story_prompt})
+    tag = args.get('tag')
+    optional_tags = args.get('optionalTags', [])
+    story_prompt = args.get('storyPrompt')
+
+    return build_post_query(tag, optional_tags, story_prompt)
+
+def _build_projection(fields: Optional[list], include_sort_key: bool = False) -> Optional[dict]:
+    """Map requested API field names onto the stored field names (both spellings for legacy docs)."""
+    if not fields:
+        return None
+    projection = {}
+    for field in fields:
+        for stored_name in POST_FIELD_STORAGE[field]:
+            projection[stored_name] = 1
+    if include_sort_key:
+        projection['created_at'] = 1
+    return projection
+
+def _encode_page_cursor(post: dict) -> str:
+    created_at = post.get('created_at')
+    if isinstance(created_at, datetime.datetime):
+        created_at = created_at.isoformat()
+    elif created_at is not None:
+        created_at = str(created_at)
+    raw = json.dumps([created_at, str(post['_id'])]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def _listing_cache_key(query: dict, projection: Optional[dict], page_args: dict) -> str:
+    """Deterministic key for a validated listing request (filters, projection and page)."""
+    return json.dumps([query, projection, page_args], sort_keys=True, default=str)
+
+def _listing_mimetype() -> str:
+    """JSON by default; NDJSON only when the client prefers it over JSON."""
+    best = request.accept_mimetypes.best_match(['application/json', 'application/x-ndjson'])
+    return best or 'application/json'
+
+def _with_listing_validators(response, etag: str, last_modified: Optional[datetime.datetime]):
+    response.set_etag(etag)
+    response.vary.add('Accept')
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Clients may keep the listing but must revalidate it on every use.
+    response.cache_control.no_cache = True
+    return response
+
 # Example route to retrieve all posts
 @app.route('/api/posts', methods=['GET'])
 def get_posts():
@@ -401,72 +780,469 @@ def get_posts():
         collectionFormat: multi  # This allows multiple tags
         required: false
         description: Optional list of tags to filter posts
+      - name: storyPrompt
+        in: query
+        type: string
+        required: false
+        description: Story prompt to filter posts
+      - name: bbox
+        in: query
+        type: string
+        required: false
+        description: Viewport as minLng,minLat,maxLng,maxLat; only posts inside it are returned
+      - name: center
+        in: query
+        type: string
+        required: false
+        description: Center point as lng,lat; must be combined with radius
+      - name: radius
+        in: query
+        type: number
+        required: false
+        description: Search radius in meters around center; results are ordered by distance
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Page size (1-1000). When limit or cursor is given the response is {posts, next_cursor}, newest first
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Opaque next_cursor value from the previous page
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated fields to return (title, content, location, tag, optionalTags, storyPrompt, createdAt, updatedAt, imageStatus); _id is always included
+      - name: stream
+        in: query
+        type: boolean
+        required: false
+        description: Stream the (unpaginated) JSON array from the database cursor instead of building it in memory
+      - name: Accept
+        in: header
+        type: string
+        required: false
+        description: Send application/x-ndjson to receive a streamed newline-delimited listing (unpaginated requests only)
+      - name: If-None-Match
+        in: header
+        type: string
+        required: false
+        description: ETag from a previous response; returns 304 while no story has changed
     responses:
       200:
-        description: A list of posts
+        description: A list of posts, or a page of posts when paginating
+      304:
+        description: Not modified
       400:
         description: input validation error
     """
     try:
-        # Get single tag if provided
-        tag = request.args.get('tag')
-        
-        # Get optional tags list if provided
-        raw_optional_tags = request.args.getlist('optionalTags')  # This returns a list directly
+        query = _load_post_filters()
 
-        # Get story prompt if provided
-        story_prompt = request.args.get('storyPrompt')
-        
-        # Validate and load filters
-        args = tag_schema.load({'tag': tag, 'optionalTags': raw_optional_tags, 'storyPrompt': story_prompt})
-        tag = args.get('tag')
-        optional_tags = args.get('optionalTags', [])
-        story_prompt = args.get('storyPrompt')
+        # Validate and load the optional spatial filter
+        geo_args = geo_query_schema.load({
+            'bbox': request.args.get('bbox'),
+            'center': request.args.get('center'),
+            'radius': request.args.get('radius'),
+        })
 
-        query = {'status': 'approved'}  # Only return approved posts by default
-        
-        and_filters = []
-        if tag:
-            and_filters.append({'tag': tag})
-        if optional_tags:
-            and_filters.append({'optional_tags': {'$all': optional_tags}})
-        if story_prompt:
-            and_filters.append({'story_prompt': story_prompt})
+        # $nearSphere must stay a top-level predicate, so the spatial filter is never nested in $and
+        geo_filter = _build_geo_filter(geo_args)
+        if geo_filter:
+            query['location'] = geo_filter
 
-        if len(and_filters) == 1:
-            query.update(and_filters[0])
-        elif len(and_filters) > 1:
-            query['$and'] = and_filters
-        
-        posts = list(collection.find(query))
-        # Convert ObjectId to string to make it JSON serializable
-        for post in posts:
-            post['_id'] = str(post['_id'])
-            # Handle date field conversion - check both formats
-            if 'created_at' in post:
-                created_at = post.pop('created_at')
-                # Convert datetime object to ISO string if needed
-                if isinstance(created_at, datetime.datetime):
-                    post['createdAt'] = created_at.isoformat()
-                else:
-                    post['createdAt'] = created_at
-            elif 'createdAt' not in post:
-                # If no date field exists, use current time as fallback
-                post['createdAt'] = datetime.datetime.now(datetime.timezone.utc).isoformat()
-            # Convert optional_tags to optionalTags for frontend compatibility
-            if 'optional_tags' in post:
-                post['optionalTags'] = post.pop('optional_tags')
-            elif 'optionalTags' not in post:
-                post['optionalTags'] = []
-
-            # Convert story_prompt to storyPrompt for frontend compatibility
-            if 'story_prompt' in post:
-                post['storyPrompt'] = post.pop('story_prompt')
-        return jsonify(posts), 200
+        page_args = page_query_schema.load({
+            'limit': request.args.get('limit'),
+            'cursor': request.args.get('cursor'),
+            'fields': request.args.get('fields'),
+        })
+        fields_requested = page_args.get('field_names')
+        paginate = page_args.get('limit') is not None or page_args.get('cursor') is not None
+        projection = _build_projection(fields_requested, include_sort_key=paginate)
+
+        listing_key = _listing_cache_key(query, projection, page_args)
+        mimetype = _listing_mimetype()
+        posts_version = _get_posts_version()
+        etag = hashlib.sha256(f"{posts_version['version']}:{mimetype}:{listing_key}".encode('utf-8')).hexdigest()
+        last_modified = posts_version.get('updated_at')
+
+        # Repeat visits with an unchanged collection are answered without touching stories.
+        if request.if_none_match.contains_weak(etag) or (
+            not request.if_none_match
+            and last_modified is not None
+            and request.if_modified_since is not None
+            and request.if_modified_since >= last_modified.replace(tzinfo=datetime.timezone.utc, microsecond=0)
+        ):
+            return _with_listing_validators(app.response_class(status=304), etag, last_modified)
+
+        # Full listings can be streamed straight from the cursor instead of being built in memory.
+        if not paginate and (mimetype == 'application/x-ndjson' or request.args.get('stream', '').lower() in ('1', 'true')):
+            posts = (
+                serialize_post(post, fields_requested)
+                for post in collection.find(query, projection, batch_size=STREAM_BATCH_SIZE)
+            )
+            serializer = iter_ndjson if mimetype == 'application/x-ndjson' else iter_json_array
+            response = app.response_class(stream_with_context(serializer(posts, app.json.dumps)), mimetype=mimetype)
+            return _with_listing_validators(response, etag, last_modified), 200
+
+        cache_key = posts_cache.key_for(f"{posts_version['version']}:{listing_key}")
+        cached_body = posts_cache.get(cache_key)
+        if cached_body is not None:
+            response = app.response_class(cached_body, mimetype='application/json')
+            response.headers['X-Cache'] = 'HIT'
+            return _with_listing_validators(response, etag, last_modified), 200
+
+        if not paginate:
+            posts = [serialize_post(post, fields_requested) for post in collection.find(query, projection)]
+            response = jsonify(posts)
+        else:
+            limit = page_args.get('limit') or DEFAULT_PAGE_SIZE
+            if page_args.get('cursor') is not None:
+                query.setdefault('$and', []).append(keyset_filter(page_args['cursor']))
+
+            # Fetch one extra document to know whether another page exists.
+            docs = list(collection.find(query, projection).sort(POSTS_SORT).limit(limit + 1))
+            next_cursor = _encode_page_cursor(docs[limit - 1]) if len(docs) > limit else None
+            posts = [serialize_post(post, fields_requested) for post in docs[:limit]]
+            response = jsonify({'posts': posts, 'next_cursor': next_cursor})
+
+        posts_cache.set(cache_key, response.get_data())
+        response.headers['X-Cache'] = 'MISS'
+        return _with_listing_validators(response, etag, last_modified), 200
+
+    except ValidationError as err:
+        return jsonify({'errors': err.messages}), 400
+    except OperationFailure as err:
+        return _geo_query_error(query, err)
+
+def _encode_search_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps(offset).encode('utf-8')).decode('ascii')
+
+@app.route('/api/posts/search', methods=['GET'])
+def search_posts():
+    """
+    Search approved posts by text, most relevant first
+    ---
+    parameters:
+      - name: q
+        in: query
+        type: string
+        required: true
+        description: Words to find in the title, description or optional tags (whole words, no stemming; "quoted phrase" and -excluded words are supported)
+      - name: tag
+        in: query
+        type: string
+        required: false
+        description: Single tag to filter posts
+      - name: optionalTags
+        in: query
+        type: array
+        items:
+          type: string
+        collectionFormat: multi
+        required: false
+        description: Optional list of tags to filter posts
+      - name: storyPrompt
+        in: query
+        type: string
+        required: false
+        description: Story prompt to filter posts
+      - name: bbox
+        in: query
+        type: string
+        required: false
+        description: Viewport as minLng,minLat,maxLng,maxLat; only posts inside it are returned
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Page size (1-100, default 20)
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Opaque next_cursor value from the previous page. Results stop after the first 1000 matches
+    responses:
+      200:
+        description: '{posts, next_cursor}; each post carries its relevance score'
+      400:
+        description: input validation error
+    """
+    try:
+        query = _load_post_filters()
+        search_args = search_query_schema.load({
+            key: request.args[key] for key in ('q', 'bbox', 'center', 'radius', 'limit', 'cursor') if request.args.get(key)
+        })
+    except ValidationError as err:
+        return jsonify({'errors': err.messages}), 400
+
+    geo_filter = _build_geo_filter(search_args)
+    if geo_filter:
+        query['location'] = geo_filter
+    query['$text'] = {'$search': search_args['q'].strip()}
+    offset, limit = search_args['cursor'], min(search_args['limit'], MAX_SEARCH_RESULTS - search_args['cursor'])
+
+    posts_version = _get_posts_version()
+    cache_key = posts_cache.key_for(f"{posts_version['version']}:{_listing_cache_key(query, None, {'offset': offset, 'limit': limit})}")
+    cached_body = posts_cache.get(cache_key)
+    if cached_body is not None:
+        response = app.response_class(cached_body, mimetype='application/json')
+        response.headers['X-Cache'] = 'HIT'
+        return response, 200
+
+    # Fetch one extra document to know whether another page exists.
+    try:
+        docs = list(
+            collection.find(query, {'score': {'$meta': 'textScore'}})
+            .sort([('score', {'$meta': 'textScore'}), ('created_at', -1), ('_id', -1)])
+            .skip(offset)
+            .limit(limit + 1)
+        )
+    except OperationFailure as err:
+        return _geo_query_error(query, err)
+    next_offset = offset + limit
+    next_cursor = _encode_search_cursor(next_offset) if len(docs) > limit and next_offset < MAX_SEARCH_RESULTS else None
+    posts = []
+    for post in docs[:limit]:
+        post = serialize_post(post)
+        post['score'] = round(post['score'], 4)
+        posts.append(post)
+    response = jsonify({'posts': posts, 'next_cursor': next_cursor})
+
+    posts_cache.set(cache_key, response.get_data())
+    response.headers['X-Cache'] = 'MISS'
+    return response, 200
+
+@app.route('/api/posts/export', methods=['GET'])
+def export_posts():
+    """
+    Download every approved post as GeoJSON, CSV or NDJSON (streamed)
+    ---
+    parameters:
+      - name: format
+        in: query
+        type: string
+        required: false
+        description: geojson (FeatureCollection, default), csv or ndjson
+      - name: tag
+        in: query
+        type: string
+        required: false
+        description: Single tag to filter posts
+      - name: optionalTags
+        in: query
+        type: array
+        items:
+          type: string
+        collectionFormat: multi
+        required: false
+        description: Optional list of tags to filter posts
+      - name: storyPrompt
+        in: query
+        type: string
+        required: false
+        description: Story prompt to filter posts
+      - name: since
+        in: query
+        type: string
+        required: false
+        description: ISO 8601 time; only posts created or updated at or after it. Pass the X-Export-Started-At value of the previous export (posts may repeat; dedupe on _id)
+    responses:
+      200:
+        description: The export, in no particular order. CSV columns match the bulk import format plus _id and updatedAt
+      400:
+        description: input validation error
+    """
+    try:
+        query = _load_post_filters()
+        export_args = export_query_schema.load({key: request.args[key] for key in ('format', 'since') if request.args.get(key)})
+    except ValidationError as err:
+        return jsonify({'errors': err.messages}), 400
+
+    fmt = export_args['format']
+    since = export_args.get('since')
+    if since is not None and since.tzinfo is None:
+        since = since.replace(tzinfo=datetime.timezone.utc)
+    started_at = datetime.datetime.now(datetime.timezone.utc)
+
+    body = iter_export(find_for_export(collection, query, since), fmt, app.json.dumps)
+    response = app.response_class(stream_with_context(body), mimetype=EXPORT_MIMETYPES[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename="stories.{fmt}"'
+    response.headers['X-Export-Started-At'] = started_at.isoformat()
+    response.cache_control.no_store = True
+    return response
+
+@app.route('/api/posts/clusters', methods=['GET'])
+def get_post_clusters():
+    """
+    Get pre-aggregated marker clusters for a zoom level
+    ---
+    parameters:
+      - name: zoom
+        in: query
+        type: integer
+        required: true
+        description: Map zoom level (0-22); higher zoom levels produce smaller cells
+      - name: bbox
+        in: query
+        type: string
+        required: false
+        description: Viewport as minLng,minLat,maxLng,maxLat; only posts inside it are clustered
+      - name: tag
+        in: query
+        type: string
+        required: false
+        description: Single tag to filter posts
+      - name: optionalTags
+        in: query
+        type: array
+        items:
+          type: string
+        collectionFormat: multi
+        required: false
+        description: Optional list of tags to filter posts
+      - name: storyPrompt
+        in: query
+        type: string
+        required: false
+        description: Story prompt to filter posts
+    responses:
+      200:
+        description: Clusters with count, centroid location and tag breakdown
+      400:
+        description: input validation error
+    """
+    try:
+        query = _load_post_filters()
+
+        cluster_args = cluster_query_schema.load({
+            'zoom': request.args.get('zoom'),
+            'bbox': request.args.get('bbox'),
+        })
+        geo_filter = _build_geo_filter(cluster_args)
+        if geo_filter:
+            query['location'] = geo_filter
+
+        clusters = []
+        for bucket in collection.aggregate(build_cluster_pipeline(query, cluster_args['zoom'])):
+            count = bucket['count']
+            tags = {item['tag']: item['count'] for item in bucket['tags'] if item.get('tag')}
+            cluster = {
+                'count': count,
+                'location': {
+                    'type': 'Point',
+                    'coordinates': [bucket['sum_lng'] / count, bucket['sum_lat'] / count],
+                },
+                'tags': tags,
+                'dominantTag': max(tags, key=tags.get) if tags else None,
+            }
+            # Single-story cells can be rendered as a normal marker by the client.
+            if count == 1:
+                cluster['postId'] = str(bucket['post_id'])
+            clusters.append(cluster)
+
+        return jsonify({'zoom': cluster_args['zoom'], 'clusters': clusters}), 200
+
+    except ValidationError as err:
+        return jsonify({'errors': err.messages}), 400
+    except OperationFailure as err:
+        return _geo_query_error(query, err)
+
+def _post_etag(post: dict) -> str:
+    """Strong ETag for a single story, derived from its last modification time."""
+    version = post.get('updated_at') or post.get('created_at') or post['_id'].generation_time
+    if isinstance(version, datetime.datetime):
+        version = version.isoformat()
+    return hashlib.sha256(f"{post['_id']}:{version}".encode('utf-8')).hexdigest()
 
+@app.route('/api/posts/<id>', methods=['GET'])
+def get_post(id):
+    """
+    Get a single post by ID
+    ---
+    parameters:
+      - name: id
+        in: path
+        required: true
+        type: string
+        description: The ID of the post to retrieve
+      - name: If-None-Match
+        in: header
+        type: string
+        required: false
+        description: ETag from a previous response; a match returns 304
+    responses:
+      200:
+        description: The post
+      304:
+        description: Not modified
+      400:
+        description: Invalid post ID
+      404:
+        description: Post not found
+    """
+    # Validate the post_id to ensure it's a valid ObjectId
+    if not ObjectId.is_valid(id):
+        return jsonify({'error': 'Invalid post ID'}), 400
+
+    post = collection.find_one({'_id': ObjectId(id), 'status': 'approved'})
+    if post is None:
+        return jsonify({'message': 'Post not found'}), 404
+
+    etag = _post_etag(post)
+    response = jsonify(serialize_post(post))
+    response.set_etag(etag)
+    # Let browsers and CDNs store the body but revalidate it with If-None-Match.
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+@app.route('/api/boundary/canada', methods=['GET'])
+def get_canada_boundary():
+    """
+    Get the Canada boundary simplified for a zoom level
+    ---
+    parameters:
+      - name: zoom
+        in: query
+        type: integer
+        required: false
+        description: Map zoom level (default 4); detail is capped at zoom 6
+    responses:
+      200:
+        description: GeoJSON FeatureCollection with a simplified MultiPolygon
+      304:
+        description: Not modified
+      400:
+        description: input validation error
+      404:
+        description: Boundary source file not found
+    """
+    try:
+        args = boundary_query_schema.load({'zoom': request.args.get('zoom', 4)})
     except ValidationError as err:
         return jsonify({'errors': err.messages}), 400
 
+    # Encoded once per zoom level and kept by the store; init_compression leaves it alone.
+    encoding = accepted_encoding()
+    try:
+        body, etag = boundary_store.get(args['zoom'], encoding)
+    except FileNotFoundError:
+        return jsonify({'error': 'Boundary data not available'}), 404
+
+    response = app.response_class(body, mimetype='application/geo+json')
+    response.vary.add('Accept-Encoding')
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+    # Weak for an encoded body, as init_compression does.
+    response.set_etag(etag, weak=encoding is not None)
+    # The outline only changes with a new build, so clients and CDNs may keep it for a day.
+    response.cache_control.public = True
+    response.cache_control.max_age = 86400
+    return response.make_conditional(request)
+
 # UPDATE (Modify a document by ID)
 @app.route('/api/posts/update/<id>', methods=['PUT'])
 @auth['moderator_required']
@@ -506,17 +1282,16 @@ def update_post(id):
             return jsonify({'success': False, 'message': 'CAPTCHA token missing'}), 400
 
         # Verify the hCaptcha token with the hCaptcha verification endpoint
-        verification_response = requests.post(
-            captcha_url or 'https://hcaptcha.com/siteverify',
-            data={
-                'secret': captcha_secret_key,
-                'response': hcaptcha_response
-            }
-        )
-
-        verification_result = verification_response.json()
+        try:
+            verification_result = captcha_verifier.verify(hcaptcha_response, _get_client_fingerprint())
+        except (requests.RequestException, ValueError) as e:
+            logger.warning('CAPTCHA verification unavailable', extra={'error': str(e)})
+            return jsonify({'success': False, 'message': 'CAPTCHA verification unavailable'}), 503
         if not verification_result.get('success'):
-            print(f"CAPTCHA verification failed: {verification_result}")
+            logger.info('CAPTCHA verification failed', extra={
+                'error_codes': verification_result.get('error-codes'),
+                'sample_rate': CLIENT_ERROR_LOG_SAMPLE_RATE,
+            })
             return jsonify({'success': False, 'message': 'CAPTCHA verification failed'}), 400
 
         data['updated_at'] = datetime.datetime.now(datetime.timezone.utc)  # Add updated_at timestamp
@@ -541,6 +1316,8 @@ def update_post(id):
 
         if result.matched_count == 0:
             return jsonify({'message': 'Post not found'}), 404
+        _mark_posts_changed()
+        captcha_verifier.forget(hcaptcha_response, _get_client_fingerprint())
 
         return jsonify({'message': 'Post updated'}), 200
     
@@ -579,10 +1356,12 @@ def delete_post(id):
 
         if result.deleted_count == 0:
             return jsonify({'message': 'Post not found'}), 404
+        _mark_posts_changed()
 
         return jsonify({'message': 'Post deleted'}), 200
 
     except Exception as e:
+        logger.exception('Unexpected error deleting post')
         return jsonify({'error': str(e)}), 500
 
 if __name__ == "__main__":
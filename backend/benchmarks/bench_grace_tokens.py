@@ -0,0 +1,80 @@
+"""Compare CAPTCHA grace token validation: the previous itsdangerous path vs grace_tokens.py.
+
+The previous path re-hashed the User-Agent and deserialised a JSON payload on every call; the
+compact format checks expiry and the client fingerprint from fixed offsets before one HMAC.
+
+Usage: python benchmarks/bench_grace_tokens.py [iterations]
+"""
+import hashlib
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+
+from grace_tokens import GraceTokenSigner, client_fingerprint
+
+SECRET_KEY = 'benchmark-secret'
+TTL_SECONDS = 300
+IP = '203.0.113.7'
+USER_AGENT = 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36'
+
+
+def _legacy_ua_hash() -> str:
+    return hashlib.sha256(USER_AGENT.encode('utf-8')).hexdigest()
+
+
+legacy_serializer = URLSafeTimedSerializer(SECRET_KEY, salt='captcha-grace')
+
+
+def legacy_make() -> str:
+    return legacy_serializer.dumps({'ip': IP, 'ua': _legacy_ua_hash()})
+
+
+def legacy_is_valid(token: str) -> bool:
+    try:
+        payload = legacy_serializer.loads(token, max_age=TTL_SECONDS)
+    except (SignatureExpired, BadSignature):
+        return False
+    return payload.get('ip') == IP and payload.get('ua') == _legacy_ua_hash()
+
+
+signer = GraceTokenSigner(SECRET_KEY, TTL_SECONDS)
+
+
+def compact_make() -> str:
+    return signer.make(client_fingerprint(IP, USER_AGENT))
+
+
+def compact_is_valid(token: str) -> bool:
+    # One fingerprint per request, as cached on flask.g by app._get_client_fingerprint.
+    return signer.is_valid(token, client_fingerprint(IP, USER_AGENT))
+
+
+def _report(label: str, func, iterations: int) -> float:
+    seconds = min(timeit.repeat(func, number=iterations, repeat=5))
+    per_call_us = seconds / iterations * 1e6
+    print(f'{label:<28} {per_call_us:8.2f} us/call')
+    return per_call_us
+
+
+def main(iterations: int):
+    legacy_token = legacy_make()
+    compact_token = compact_make()
+    assert legacy_is_valid(legacy_token) and compact_is_valid(compact_token)
+    expired_token = signer.make(client_fingerprint(IP, USER_AGENT), now=0)
+
+    print(f'{iterations} iterations, best of 5')
+    legacy_valid = _report('itsdangerous validate', lambda: legacy_is_valid(legacy_token), iterations)
+    compact_valid = _report('compact validate', lambda: compact_is_valid(compact_token), iterations)
+    _report('compact reject (expired)', lambda: compact_is_valid(expired_token), iterations)
+    legacy_mint = _report('itsdangerous mint', legacy_make, iterations)
+    compact_mint = _report('compact mint', compact_make, iterations)
+    print(f'validate speedup: {legacy_valid / compact_valid:.1f}x, mint speedup: {legacy_mint / compact_mint:.1f}x')
+    print(f'token length: itsdangerous {len(legacy_token)} chars, compact {len(compact_token)} chars')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,236 @@
+"""Query-plan regression check for the Mongo queries the app issues.
+
+Seeds a scratch database on a local mongod with synthetic stories/users/image jobs, creates
+the indexes declared in ``indexes.py``, then runs ``explain`` (executionStats) for:
+
+- every tag / optionalTags / storyPrompt combination ``get_posts`` builds (via
+  ``queries.build_post_query``), unpaginated, as a keyset page, with a bbox filter, with a
+  center+radius filter, as an incremental export (``since``), as a text search and as the
+  ``/api/posts/clusters`` aggregation (``queries.build_cluster_pipeline``);
+- ``GET /api/posts/<id>``;
+- every filter ``PostView.scaffold_filters`` returns, as the admin list issues it (default sort,
+  page of ``PostView.page_size``), the admin list sorted by each sortable column and the admin
+  search;
+- the ``verify_user`` lookup and the image upload queue's resume query.
+
+A shape fails when its winning plan contains a COLLSCAN, or when it examines more than
+``--max-ratio`` documents per document returned and more than ``--min-docs`` documents in all.
+The floor keeps shapes that return next to nothing (a bbox or a three-filter combination on the
+seeded data) from failing on a few dozen fetched documents; a missing index on 5000 stories
+examines thousands. Aggregations are measured against the documents their ``$match`` selects,
+not the groups they return. The admin "contains" filters (an unanchored regex, which cannot
+bound an index scan) are explained and must not COLLSCAN, but are not held to the ratio; the
+admin search box is their indexed alternative. Exits non-zero on any failure, so it can run in
+CI next to a throwaway mongod.
+
+Usage: python benchmarks/explain_queries.py [--uri mongodb://localhost:27017/storymap_explain]
+       [--stories 5000] [--max-ratio 10] [--min-docs 100] [--keep]
+"""
+import argparse
+import datetime
+import itertools
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson.objectid import ObjectId
+from flask_admin.contrib.pymongo.filters import FilterLike
+from pymongo import MongoClient
+
+from admin.forms import PostForm
+from admin.post_view import PostView
+from export import export_query
+from indexes import ensure_indexes
+from queries import POSTS_SORT, bbox_to_geometry, build_cluster_pipeline, build_post_query, keyset_filter
+
+DEFAULT_URI = 'mongodb://localhost:27017/storymap_explain'
+LISTING_PAGE_SIZE = 100
+SEARCH_PAGE_SIZE = 20
+SEARCH_SORT = [('score', {'$meta': 'textScore'}), ('created_at', -1), ('_id', -1)]
+CLUSTER_ZOOM = 4
+
+TAGS = [value for value, _ in PostForm.tag.kwargs['choices']]
+STORY_PROMPTS = [value for value, _ in PostForm.story_prompt.kwargs['choices'] if value]
+OPTIONAL_TAGS = ['Flooding', 'Wildfire smoke', 'Heat', 'Drought', 'Community garden', 'Transit', 'Ice roads', 'Coastal erosion']
+STATUSES = ['approved'] * 8 + ['pending', 'rejected']
+
+
+def seed(db, story_count: int, rng: random.Random):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    stories = []
+    for i in range(story_count):
+        story = {
+            'title': f'Story {i}',
+            'content': {'description': 'Synthetic story for query-plan checks.'},
+            'tag': rng.choice(TAGS),
+            'optional_tags': rng.sample(OPTIONAL_TAGS, rng.randint(0, 3)),
+            'status': rng.choice(STATUSES),
+            'created_at': now - datetime.timedelta(minutes=rng.randint(0, 60 * 24 * 365)),
+        }
+        if rng.random() < 0.1:
+            story['updated_at'] = story['created_at'] + datetime.timedelta(minutes=rng.randint(1, 60 * 24 * 30))
+        if rng.random() < 0.5:
+            story['story_prompt'] = rng.choice(STORY_PROMPTS)
+        if rng.random() < 0.9:
+            story['location'] = {'type': 'Point', 'coordinates': [rng.uniform(-140, -53), rng.uniform(42, 70)]}
+        stories.append(story)
+    db.stories.insert_many(stories)
+    db.users.insert_many([{'username': f'user{i}', 'password': 'x', 'role': 'moderator'} for i in range(50)])
+    db.image_jobs.insert_many([
+        {'post_id': ObjectId(), 'status': rng.choice(['done'] * 18 + ['pending', 'running']), 'leased_at': now}
+        for _ in range(max(1, story_count // 10))
+    ])
+
+
+def listing_shapes(sample_story: dict):
+    """(name, collection, filter, sort, limit[, options]) for every GET /api/posts (and export,
+    search and clusters) query shape. ``options`` may hold an aggregation ``pipeline`` (whose
+    ``$match`` is ``filter``) or ``check_ratio: False``."""
+    cursor = keyset_filter([sample_story['created_at'], sample_story['_id']])
+    bbox = {'$geoWithin': {'$geometry': bbox_to_geometry(-80.0, 43.0, -73.0, 46.0)}}
+    # Same filter as _build_geo_filter for center=-75.7,45.4&radius=200000 (Ottawa).
+    near = {'$nearSphere': {'$geometry': {'type': 'Point', 'coordinates': [-75.7, 45.4]}, '$maxDistance': 200000}}
+    for use_tag, use_optional, use_prompt in itertools.product((False, True), repeat=3):
+        query = build_post_query(
+            TAGS[0] if use_tag else None,
+            OPTIONAL_TAGS[:2] if use_optional else None,
+            STORY_PROMPTS[0] if use_prompt else None,
+        )
+        name = '+'.join(label for label, used in (('tag', use_tag), ('optionalTags', use_optional), ('storyPrompt', use_prompt)) if used) or 'all'
+        yield f'posts[{name}]', 'stories', query, None, 0
+
+        paged = dict(query, **{'$and': query.get('$and', []) + [cursor]})
+        yield f'posts[{name}] keyset page', 'stories', paged, POSTS_SORT, LISTING_PAGE_SIZE + 1
+
+        yield f'posts[{name}] bbox', 'stories', dict(query, location=bbox), None, 0
+
+        yield f'posts[{name}] center+radius', 'stories', dict(query, location=near), None, 0
+
+        yield f'export[{name}] since', 'stories', export_query(query, sample_story['created_at']), None, 0
+
+        # Same filter and order as GET /api/posts/search.
+        searched = dict(query, **{'$text': {'$search': '42'}})
+        yield f'search[{name}]', 'stories', searched, SEARCH_SORT, SEARCH_PAGE_SIZE + 1
+
+        yield f'clusters[{name}]', 'stories', query, None, 0, {'pipeline': build_cluster_pipeline(query, CLUSTER_ZOOM)}
+        bounded = dict(query, location=bbox)
+        yield f'clusters[{name}] bbox', 'stories', bounded, None, 0, {'pipeline': build_cluster_pipeline(bounded, CLUSTER_ZOOM)}
+    yield 'post by id', 'stories', {'_id': sample_story['_id'], 'status': 'approved'}, None, 0
+
+
+def admin_shapes():
+    view = PostView.__new__(PostView)  # the query builders used here do not touch instance state
+    sample_values = {'title': 'Story 42', 'tag': TAGS[0], 'status': 'pending', 'created_at': '0', 'story_prompt': STORY_PROMPTS[0]}
+    default_sort = view._list_sort(None, False)  # what PostView.get_list sends without a chosen sort
+    for column in PostView.column_filters:
+        for flt in view.scaffold_filters(column):
+            query = flt.apply([], flt.clean(sample_values[column]))[0]
+            options = {'check_ratio': not isinstance(flt, FilterLike)}
+            yield f'admin filter {column} {type(flt).__name__}', 'stories', query, default_sort, PostView.page_size, options
+    for column in PostView.column_sortable_list:
+        for desc in (False, True):
+            order = 'desc' if desc else 'asc'
+            yield f'admin list sorted by {column} {order}', 'stories', {}, view._list_sort(column, desc), PostView.page_size
+    yield 'admin search', 'stories', view._search({}, '42'), view._list_sort(None, False), PostView.page_size
+
+
+def other_shapes(now: datetime.datetime):
+    yield 'verify_user', 'users', {'username': 'user7'}, None, 0
+    # Same filter as ImageUploadQueue._resume_pending.
+    stale = now - datetime.timedelta(seconds=300)
+    yield 'image jobs resume', 'image_jobs', {'$or': [{'status': 'pending'}, {'status': 'running', 'leased_at': {'$lt': stale}}]}, None, 0
+
+
+def _stages(plan):
+    """Every stage name in an explain plan tree (classic or slot-based engine output)."""
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            yield plan['stage']
+        for value in plan.values():
+            yield from _stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _stages(item)
+
+
+def explain(db, collection: str, query: dict, sort, limit: int, pipeline=None) -> dict:
+    if pipeline is not None:
+        command = {'aggregate': collection, 'pipeline': pipeline, 'cursor': {}}
+    else:
+        command = {'find': collection, 'filter': query}
+        if sort:
+            command['sort'] = dict(sort)
+        if limit:
+            command['limit'] = limit
+    return db.command('explain', command, verbosity='executionStats')
+
+
+def _query_layer(result: dict) -> tuple:
+    """(winningPlan, executionStats) of a find explain, or of the query an aggregation runs
+    (top level when the whole pipeline is pushed down, else its leading ``$cursor`` stage)."""
+    if 'executionStats' not in result and 'stages' in result:
+        result = result['stages'][0]['$cursor']
+    return result['queryPlanner']['winningPlan'], result['executionStats']
+
+
+def check(db, shapes, max_ratio: float, min_docs: int) -> int:
+    failures = 0
+    for name, collection, query, sort, limit, *extra in shapes:
+        options = extra[0] if extra else {}
+        pipeline = options.get('pipeline')
+        plan, stats = _query_layer(explain(db, collection, query, sort, limit, pipeline))
+        stages = set(_stages(plan))
+        examined = stats['totalDocsExamined']
+        # An aggregation returns groups; compare with the documents its $match selects instead.
+        returned = db[collection].count_documents(query) if pipeline is not None else stats['nReturned']
+        ratio = examined / max(returned, 1)
+
+        problems = []
+        if 'COLLSCAN' in stages:
+            problems.append('COLLSCAN')
+        if ratio > max_ratio and examined > min_docs and options.get('check_ratio', True):
+            problems.append(f'examined {ratio:.1f}x returned')
+        failures += bool(problems)
+
+        indexes = sorted({stage for stage in stages if stage in ('IXSCAN', 'IDHACK', 'EXPRESS_IXSCAN', 'GEO_NEAR_2DSPHERE', 'TEXT_MATCH')})
+        status = 'FAIL ' + ', '.join(problems) if problems else 'ok'
+        print(f"{name:<55} returned={returned:<6} docs={examined:<6} keys={stats['totalKeysExamined']:<6} "
+              f"{'/'.join(indexes) or '-':<12} {status}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--uri', default=os.getenv('EXPLAIN_MONGODB_URI', DEFAULT_URI))
+    parser.add_argument('--stories', type=int, default=5000)
+    parser.add_argument('--max-ratio', type=float, default=10.0)
+    parser.add_argument('--min-docs', type=int, default=100, help='shapes examining at most this many documents pass the ratio check')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--keep', action='store_true', help='keep the scratch database afterwards')
+    args = parser.parse_args()
+
+    client = MongoClient(args.uri)
+    db = client.get_default_database('storymap_explain')
+    if 'explain' not in db.name:
+        sys.exit(f"Refusing to seed database {db.name!r}: its name must contain 'explain' (it is dropped)")
+
+    client.drop_database(db.name)
+    try:
+        seed(db, args.stories, random.Random(args.seed))
+        if ensure_indexes(db):
+            return 1
+        sample_story = db.stories.find_one({'status': 'approved'}, sort=POSTS_SORT, skip=args.stories // 4)
+        now = datetime.datetime.now(datetime.timezone.utc)
+        shapes = itertools.chain(listing_shapes(sample_story), admin_shapes(), other_shapes(now))
+        failures = check(db, shapes, args.max_ratio, args.min_docs)
+        print(f"{failures} failing query shape(s)" if failures else 'all query shapes use an index')
+        return 1 if failures else 0
+    finally:
+        if not args.keep:
+            client.drop_database(db.name)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""Load-test driver for the public API; reports latency percentiles and throughput per endpoint.
+
+Runs ``--concurrency`` worker threads (one keep-alive session each) for ``--duration`` seconds
+against a running server. Every iteration picks a weighted scenario that mirrors how the map
+uses the API: paged and filtered listings, viewport (bbox) queries, clusters, single posts, text
+search, the boundary outline and, with ``--create-share``, new stories.
+
+Creating stories needs a server that does not call hCaptcha: start it with
+``CAPTCHA_VERIFIER=stub`` (see captcha.py). Seed data first with ``seed_stories.py``.
+
+Usage: python benchmarks/load_test.py --base-url http://localhost:5000 [--duration 60]
+       [--concurrency 16] [--create-share 0.05] [--json results.json]
+"""
+import argparse
+import datetime
+import json
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+from seed_stories import OPTIONAL_TAGS, POPULATION_CENTRES, STORY_PROMPTS, TAGS, StoryFactory
+
+PAGE_SIZE = 100
+# (scenario, weight). Weights approximate map traffic: viewport reads dominate.
+READ_SCENARIOS = [
+    ('posts page', 20),
+    ('posts next page', 10),
+    ('posts by tag', 10),
+    ('posts by optionalTags', 5),
+    ('posts bbox', 25),
+    ('clusters', 15),
+    ('post by id', 10),
+    ('search', 5),
+    ('boundary', 5),
+]
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, math.ceil(pct / 100.0 * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, scenario: str, seconds: float, ok: bool):
+        with self._lock:
+            self.latencies[scenario].append(seconds)
+            if not ok:
+                self.errors[scenario] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        results = {}
+        everything = []
+        for scenario, values in sorted(self.latencies.items()):
+            everything.extend(values)
+            results[scenario] = self._stats(sorted(values), self.errors[scenario], elapsed)
+        results['total'] = self._stats(sorted(everything), sum(self.errors.values()), elapsed)
+        return results
+
+    @staticmethod
+    def _stats(values: list, errors: int, elapsed: float) -> dict:
+        return {
+            'requests': len(values),
+            'errors': errors,
+            'rps': len(values) / elapsed if elapsed else 0.0,
+            'p50_ms': percentile(values, 50) * 1000,
+            'p95_ms': percentile(values, 95) * 1000,
+            'p99_ms': percentile(values, 99) * 1000,
+            'max_ms': (values[-1] if values else 0.0) * 1000,
+        }
+
+
+class Worker:
+    def __init__(self, base_url: str, recorder: Recorder, create_share: float, rng: random.Random):
+        self.base_url = base_url.rstrip('/')
+        self.recorder = recorder
+        self.create_share = create_share
+        self.rng = rng
+        self.session = requests.Session()
+        self.story_factory = StoryFactory(rng, datetime.datetime.now(datetime.timezone.utc))
+        self.post_ids = []
+        self.next_cursor = None
+
+    def _get(self, scenario: str, path: str, params=None):
+        return self._timed(scenario, 'GET', path, params=params)
+
+    def _timed(self, scenario: str, method: str, path: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, timeout=60, **kwargs)
+            body = response.content  # include the transfer in the measurement
+            ok = response.status_code < 400
+        except requests.RequestException:
+            response, body, ok = None, b'', False
+        self.recorder.record(scenario, time.perf_counter() - started, ok)
+        if not ok or not body or response.headers.get('Content-Type', '').split(';')[0] != 'application/json':
+            return None
+        return response.json()
+
+    def _viewport(self) -> str:
+        _, lng, lat, _, _ = self.rng.choices(POPULATION_CENTRES, [centre[3] for centre in POPULATION_CENTRES])[0]
+        half_width = self.rng.choice((0.25, 1.0, 4.0))
+        return f'{lng - half_width},{lat - half_width * 0.6},{lng + half_width},{lat + half_width * 0.6}'
+
+    def _remember_page(self, payload):
+        if isinstance(payload, dict):
+            self.next_cursor = payload.get('next_cursor')
+            posts = payload.get('posts', [])
+            if posts:
+                self.post_ids = [post['_id'] for post in posts[:20]]
+
+    def run_once(self):
+        if self.create_share and self.rng.random() < self.create_share:
+            self.create()
+            return
+        scenario = self.rng.choices([name for name, _ in READ_SCENARIOS], [weight for _, weight in READ_SCENARIOS])[0]
+        rng = self.rng
+        if scenario == 'posts page' or (scenario == 'posts next page' and not self.next_cursor):
+            self._remember_page(self._get('posts page', '/api/posts', {'limit': PAGE_SIZE}))
+        elif scenario == 'posts next page':
+            self._remember_page(self._get(scenario, '/api/posts', {'limit': PAGE_SIZE, 'cursor': self.next_cursor}))
+        elif scenario == 'posts by tag':
+            self._get(scenario, '/api/posts', {'limit': PAGE_SIZE, 'tag': rng.choice(TAGS)})
+        elif scenario == 'posts by optionalTags':
+            self._get(scenario, '/api/posts', {'limit': PAGE_SIZE, 'optionalTags': rng.sample(OPTIONAL_TAGS, 2)})
+        elif scenario == 'posts bbox':
+            self._get(scenario, '/api/posts', {'limit': PAGE_SIZE * 5, 'bbox': self._viewport(), 'fields': 'location,tag,title'})
+        elif scenario == 'clusters':
+            self._get(scenario, '/api/posts/clusters', {'bbox': self._viewport(), 'zoom': rng.randint(3, 9)})
+        elif scenario == 'post by id':
+            if not self.post_ids:
+                self._remember_page(self._get('posts page', '/api/posts', {'limit': PAGE_SIZE}))
+            if self.post_ids:
+                self._get(scenario, f'/api/posts/{rng.choice(self.post_ids)}')
+        elif scenario == 'search':
+            self._get(scenario, '/api/posts/search', {'q': rng.choice(OPTIONAL_TAGS)})
+        elif scenario == 'boundary':
+            self._get(scenario, '/api/boundary/canada', {'zoom': rng.randint(2, 8)})
+
+    def create(self):
+        story = self.story_factory.make(0)
+        post_data = {
+            'title': story['title'],
+            'content': {'description': story['content']['description']},
+            'location': story['location'],
+            'tag': story['tag'],
+            'optionalTags': story['optional_tags'],
+            'storyPrompt': self.rng.choice(STORY_PROMPTS),
+            'captchaToken': f'load-test-{self.rng.random()}',
+        }
+        self._timed('create', 'POST', '/api/posts/create', data={'postData': json.dumps(post_data)})
+
+
+def run(base_url: str, duration: float, concurrency: int, create_share: float, seed: int) -> dict:
+    recorder = Recorder()
+    deadline = time.monotonic() + duration
+
+    def loop(worker: Worker):
+        while time.monotonic() < deadline:
+            worker.run_once()
+
+    threads = [
+        threading.Thread(target=loop, args=(Worker(base_url, recorder, create_share, random.Random(seed + i)),), daemon=True)
+        for i in range(concurrency)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder.summary(time.monotonic() - started)
+
+
+def print_summary(results: dict):
+    print(f"{'scenario':<24}{'requests':>10}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for scenario, stats in results.items():
+        print(f"{scenario:<24}{stats['requests']:>10}{stats['errors']:>8}{stats['rps']:>9.1f}"
+              f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}{stats['max_ms']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--base-url', default='http://localhost:5000')
+    parser.add_argument('--duration', type=float, default=60)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--create-share', type=float, default=0.0, help='fraction of iterations that create a story')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help='also write the results to this file (e.g. to keep as a baseline)')
+    args = parser.parse_args()
+
+    results = run(args.base_url, args.duration, args.concurrency, args.create_share, args.seed)
+    print_summary(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
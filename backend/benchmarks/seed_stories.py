@@ -0,0 +1,155 @@
+"""Generate realistic synthetic stories in a local MongoDB for load tests.
+
+Stories cluster around Canadian population centres (with a scatter of rural points), use the
+tags and story prompts the create form offers with a skew towards the common ones, carry 0-3
+optional tags, and about a third have a CDN image with a thumbnail. ``created_at`` is spread
+over the last two years, so keyset pages and date sorts behave as they would in production.
+
+The stories version document is bumped afterwards so running servers drop cached listings.
+
+Usage: python benchmarks/seed_stories.py --count 100000 [--uri mongodb://localhost:27017/storymap_load] [--drop]
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import MongoClient
+
+from admin.forms import PostForm
+from indexes import ensure_indexes
+
+DEFAULT_URI = 'mongodb://localhost:27017/storymap_load'
+BATCH_SIZE = 5000
+
+# (name, lng, lat, relative weight, spread in degrees)
+POPULATION_CENTRES = [
+    ('Toronto', -79.38, 43.65, 30, 0.4),
+    ('Montreal', -73.57, 45.50, 20, 0.3),
+    ('Vancouver', -123.12, 49.28, 14, 0.3),
+    ('Calgary', -114.07, 51.05, 8, 0.2),
+    ('Edmonton', -113.49, 53.55, 7, 0.2),
+    ('Ottawa', -75.70, 45.42, 7, 0.2),
+    ('Winnipeg', -97.14, 49.90, 5, 0.2),
+    ('Quebec City', -71.21, 46.81, 4, 0.2),
+    ('Hamilton', -79.87, 43.26, 4, 0.15),
+    ('Halifax', -63.57, 44.65, 3, 0.2),
+    ('Saskatoon', -106.67, 52.13, 2, 0.15),
+    ('Regina', -104.62, 50.45, 2, 0.15),
+    ("St. John's", -52.71, 47.56, 1, 0.1),
+    ('Victoria', -123.37, 48.43, 2, 0.1),
+    ('Whitehorse', -135.06, 60.72, 0.3, 0.2),
+    ('Yellowknife', -114.37, 62.45, 0.3, 0.2),
+    ('Iqaluit', -68.52, 63.75, 0.2, 0.1),
+]
+# Share of stories placed uniformly in the southern band where most of the rural population lives.
+RURAL_SHARE = 0.1
+RURAL_BOUNDS = (-128.0, 43.0, -60.0, 56.0)
+
+TAGS = [value for value, _ in PostForm.tag.kwargs['choices']]
+LEGACY_TAGS = {'Positive', 'Neutral', 'Negative'}
+STORY_PROMPTS = [value for value, _ in PostForm.story_prompt.kwargs['choices'] if value]
+OPTIONAL_TAGS = [
+    'Flooding', 'Wildfire smoke', 'Heat', 'Drought', 'Community garden', 'Transit', 'Ice roads',
+    'Coastal erosion', 'Food prices', 'Insurance', 'Youth', 'Indigenous knowledge', 'Farming', 'Permafrost',
+]
+WORDS = (
+    'river smoke summer winter road town family neighbours water field forest storm heat power '
+    'school garden ice coast farm season memory change worry hope together help city north'
+).split()
+
+
+def _zipf_weights(count: int) -> list:
+    return [1.0 / (rank + 1) for rank in range(count)]
+
+
+class StoryFactory:
+    def __init__(self, rng: random.Random, now: datetime.datetime):
+        self.rng = rng
+        self.now = now
+        self.centres = POPULATION_CENTRES
+        self.centre_weights = [centre[3] for centre in POPULATION_CENTRES]
+        # Emotion tags follow a long-tailed distribution; legacy tags are rare.
+        self.tag_weights = [0.05 if tag in LEGACY_TAGS else weight for tag, weight in zip(TAGS, _zipf_weights(len(TAGS)))]
+        self.prompt_weights = _zipf_weights(len(STORY_PROMPTS))
+        self.optional_weights = _zipf_weights(len(OPTIONAL_TAGS))
+
+    def _location(self) -> dict:
+        rng = self.rng
+        if rng.random() < RURAL_SHARE:
+            min_lng, min_lat, max_lng, max_lat = RURAL_BOUNDS
+            lng, lat = rng.uniform(min_lng, max_lng), rng.uniform(min_lat, max_lat)
+        else:
+            _, lng, lat, _, spread = rng.choices(self.centres, self.centre_weights)[0]
+            lng, lat = rng.gauss(lng, spread), rng.gauss(lat, spread * 0.6)
+        return {'type': 'Point', 'coordinates': [round(lng, 5), round(min(max(lat, -89.9), 89.9), 5)]}
+
+    def _text(self, words: int) -> str:
+        return ' '.join(self.rng.choices(WORDS, k=words)).capitalize()
+
+    def _optional_tags(self) -> list:
+        count = self.rng.choices((0, 1, 2, 3), (40, 30, 20, 10))[0]
+        tags = set()
+        while len(tags) < count:
+            tags.add(self.rng.choices(OPTIONAL_TAGS, self.optional_weights)[0])
+        return sorted(tags)
+
+    def make(self, index: int) -> dict:
+        rng = self.rng
+        content = {'description': self._text(rng.randint(20, 120))}
+        if rng.random() < 0.33:
+            content['image'] = f'https://i.ibb.co/seed/{index}.webp'
+            content['thumbnail'] = f'https://i.ibb.co/seed/{index}-thumb.webp'
+        story = {
+            'title': self._text(rng.randint(3, 8)),
+            'content': content,
+            'location': self._location(),
+            'tag': rng.choices(TAGS, self.tag_weights)[0],
+            'optional_tags': self._optional_tags(),
+            'status': rng.choices(('approved', 'pending', 'rejected'), (90, 7, 3))[0],
+            # Skewed towards recent stories, as on a growing site.
+            'created_at': self.now - datetime.timedelta(seconds=int(2 * 365 * 86400 * rng.random() ** 2)),
+        }
+        if rng.random() < 0.6:
+            story['story_prompt'] = rng.choices(STORY_PROMPTS, self.prompt_weights)[0]
+        return story
+
+
+def seed(db, count: int, seed_value: int = 1):
+    factory = StoryFactory(random.Random(seed_value), datetime.datetime.now(datetime.timezone.utc))
+    started = time.monotonic()
+    for start in range(0, count, BATCH_SIZE):
+        batch = [factory.make(index) for index in range(start, min(start + BATCH_SIZE, count))]
+        db.stories.insert_many(batch, ordered=False)
+        print(f"{start + len(batch)}/{count} stories ({time.monotonic() - started:.1f}s)")
+    # Same document app._mark_posts_changed bumps; running servers drop cached listings.
+    db.collection_versions.update_one(
+        {'_id': 'stories'},
+        {'$inc': {'version': 1}, '$currentDate': {'updated_at': True}},
+        upsert=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--uri', default=os.getenv('SEED_MONGODB_URI', DEFAULT_URI))
+    parser.add_argument('--count', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--drop', action='store_true', help='delete existing stories first')
+    args = parser.parse_args()
+
+    db = MongoClient(args.uri).get_default_database('storymap_load')
+    print(f"Seeding {args.count} stories into {db.name}")
+    if args.drop:
+        db.stories.drop()
+    seed(db, args.count, args.seed)
+    # Built after the bulk insert, which is much faster than maintaining them per batch.
+    ensure_indexes(db)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""Zoom-level simplification of the Canada boundary GeoJSON.
+
+The frontend only needs the outline to decide whether a clicked point is inside Canada, so
+the 1.5 MB source is simplified with Douglas-Peucker to roughly half a screen pixel at the
+requested zoom. Results are cached in memory and on disk (keyed by the source file's size
+and mtime); run ``python boundary.py`` at build time to pre-generate every zoom level. The
+gzip/brotli encodings of each level are built once and kept in memory, so the ~0.5 MB outline
+is not recompressed on every request.
+"""
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+from typing import Optional
+
+from compression import precompress
+
+logger = logging.getLogger(__name__)
+
+# About 1 km of error at zoom 6 (~0.5 MB); the 178 KB zoom 4 outline loads first. More detail
+# would only refine clicks on the coastline, at 1-1.4 MB per level.
+MAX_BOUNDARY_ZOOM = 6
+TILE_SIZE_PX = 256
+TOLERANCE_PX = 0.5
+
+# Only the properties the frontend may need survive simplification.
+KEPT_PROPERTIES = ('NAME', 'NAME_EN', 'NAME_FR', 'ISO_A2', 'ISO_A3')
+
+
+def tolerance_for_zoom(zoom: int) -> float:
+    """Degrees of longitude covered by ``TOLERANCE_PX`` pixels at ``zoom``."""
+    return TOLERANCE_PX * 360.0 / (TILE_SIZE_PX * (2 ** zoom))
+
+
+def _perpendicular_distance_sq(point, start, end) -> float:
+    px, py = point
+    sx, sy = start
+    ex, ey = end
+    dx, dy = ex - sx, ey - sy
+    if dx == 0 and dy == 0:
+        return (px - sx) ** 2 + (py - sy) ** 2
+    t = max(0.0, min(1.0, ((px - sx) * dx + (py - sy) * dy) / (dx * dx + dy * dy)))
+    cx, cy = sx + t * dx, sy + t * dy
+    return (px - cx) ** 2 + (py - cy) ** 2
+
+
+def simplify_line(points: list, tolerance: float) -> list:
+    """Douglas-Peucker simplification (iterative, so long coastlines do not hit the recursion limit)."""
+    if len(points) < 3:
+        return list(points)
+    tolerance_sq = tolerance * tolerance
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        max_distance, index = 0.0, None
+        for i in range(first + 1, last):
+            distance = _perpendicular_distance_sq(points[i], points[first], points[last])
+            if distance > max_distance:
+                max_distance, index = distance, i
+        if index is not None and max_distance > tolerance_sq:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def simplify_ring(ring: list, tolerance: float) -> Optional[list]:
+    """Simplify a closed ring; returns None when it collapses below a valid polygon ring."""
+    if len(ring) < 4:
+        return None
+    # Split the closed ring at its farthest vertex so both halves have distinct endpoints.
+    start = ring[0]
+    far = max(range(1, len(ring) - 1), key=lambda i: (ring[i][0] - start[0]) ** 2 + (ring[i][1] - start[1]) ** 2)
+    simplified = simplify_line(ring[:far + 1], tolerance)[:-1] + simplify_line(ring[far:], tolerance)
+    if len(simplified) < 4:
+        return None
+    return [[round(x, 5), round(y, 5)] for x, y in simplified]
+
+
+def simplify_geometry(geometry: dict, tolerance: float) -> Optional[dict]:
+    polygons = geometry['coordinates'] if geometry['type'] == 'MultiPolygon' else [geometry['coordinates']]
+    simplified = []
+    for polygon in polygons:
+        outer = simplify_ring(polygon[0], tolerance)
+        if outer is None:
+            continue  # Islands smaller than the tolerance disappear at this zoom.
+        holes = [hole for hole in (simplify_ring(ring, tolerance) for ring in polygon[1:]) if hole]
+        simplified.append([outer] + holes)
+    if not simplified:
+        return None
+    return {'type': 'MultiPolygon', 'coordinates': simplified}
+
+
+def simplify_feature_collection(data: dict, zoom: int) -> dict:
+    tolerance = tolerance_for_zoom(zoom)
+    features = []
+    for feature in data.get('features', []):
+        geometry = simplify_geometry(feature['geometry'], tolerance)
+        if geometry is None:
+            continue
+        properties = {key: value for key, value in (feature.get('properties') or {}).items() if key in KEPT_PROPERTIES}
+        features.append({'type': 'Feature', 'properties': properties, 'geometry': geometry})
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+class BoundaryStore:
+    """Serves simplified boundary GeoJSON per zoom level from memory, disk cache or source."""
+
+    def __init__(self, source_path: str, cache_dir: str):
+        self.source_path = source_path
+        self.cache_dir = cache_dir
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    def _source_version(self) -> str:
+        stat = os.stat(self.source_path)
+        return f'{stat.st_size}-{int(stat.st_mtime)}'
+
+    def _cache_path(self, zoom: int, version: str) -> str:
+        return os.path.join(self.cache_dir, f'canada-{version}-z{zoom}.geojson')
+
+    def get(self, zoom: int, encoding: Optional[str] = None) -> tuple:
+        """Return ``(body_bytes, etag)`` for ``zoom`` clamped to [0, MAX_BOUNDARY_ZOOM].
+
+        With ``encoding`` (``gzip`` or ``br``) the body is encoded; the etag is the identity
+        body's either way.
+        """
+        zoom = max(0, min(MAX_BOUNDARY_ZOOM, zoom))
+        version = self._source_version()
+        with self._lock:
+            cached = self._memory.get((zoom, version, encoding))
+            if cached is not None:
+                return cached
+
+            body, etag = self._memory.get((zoom, version, None)) or self._load(zoom, version)
+            self._memory[(zoom, version, None)] = (body, etag)
+            if encoding is not None:
+                body = precompress(body, encoding)
+                self._memory[(zoom, version, encoding)] = (body, etag)
+            return body, etag
+
+    def _load(self, zoom: int, version: str) -> tuple:
+        body = self._read_disk_cache(zoom, version)
+        if body is None:
+            with open(self.source_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            body = json.dumps(simplify_feature_collection(data, zoom), separators=(',', ':')).encode('utf-8')
+            self._write_disk_cache(zoom, version, body)
+        return body, hashlib.sha256(body).hexdigest()
+
+    def _read_disk_cache(self, zoom: int, version: str) -> Optional[bytes]:
+        try:
+            with open(self._cache_path(zoom, version), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_disk_cache(self, zoom: int, version: str, body: bytes):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self._cache_path(zoom, version), 'wb') as f:
+                f.write(body)
+        except OSError as e:
+            logger.warning('Could not write boundary cache: %s', e)
+
+    def warm(self):
+        for zoom in range(MAX_BOUNDARY_ZOOM + 1):
+            body, _ = self.get(zoom)
+            print(f"zoom {zoom}: {len(body)} bytes")
+
+
+def default_source_path(root_path: str) -> str:
+    """Prefer the built copy in static/, falling back to the frontend sources during development."""
+    built = os.path.join(root_path, 'static', 'canada.geojson')
+    if os.path.exists(built):
+        return built
+    return os.path.join(root_path, '..', 'frontend', 'public', 'canada.geojson')
+
+
+if __name__ == '__main__':
+    backend_root = os.path.dirname(os.path.abspath(__file__))
+    source = sys.argv[1] if len(sys.argv) > 1 else default_source_path(backend_root)
+    BoundaryStore(source, os.path.join(backend_root, 'boundary_cache')).warm()
@@ -0,0 +1,238 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CacheUnavailable(RuntimeError):
+    """The backend could not be reached (raised by ``incr``, and by every call on a strict backend)."""
+
+
+class MemoryBackend:
+    """In-process key/value store with per-key expiry.
+
+    State lives in one worker process, so it is only shared between requests served by the
+    same gunicorn worker. Expiring keys are kept in an LRU bounded by ``max_entries`` and by
+    ``max_bytes`` (total size of the stored values, so a few full-collection listings cannot pin
+    the worker's memory; a value larger than ``max_bytes`` is not stored). Keys stored without a
+    TTL (e.g. version counters) are never evicted. With ``max_entries=None`` nothing is evicted
+    before it expires (used for rate-limit state, which must not be pushed out by cache churn);
+    expired entries are swept as the store grows.
+    """
+
+    def __init__(self, max_entries: Optional[int] = 1024, max_bytes: Optional[int] = None):
+        self.max_entries = None if max_entries is None else max(0, max_entries)
+        self.max_bytes = None if max_bytes is None else max(0, max_bytes)
+        self._entries = OrderedDict()
+        self._entry_bytes = 0
+        self._persistent = {}
+        self._lock = threading.Lock()
+        self._next_sweep = 1024
+
+    @staticmethod
+    def _size(value) -> int:
+        return len(value) if isinstance(value, bytes) else 0
+
+    def _discard(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._entry_bytes -= self._size(entry[1])
+
+    def _get_live(self, key: str):
+        if key in self._persistent:
+            return self._persistent[key]
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._discard(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key: str, value, ttl_seconds: int):
+        self._discard(key)
+        if ttl_seconds <= 0:
+            self._persistent[key] = value
+            return
+        self._persistent.pop(key, None)
+        if self.max_bytes is not None and self._size(value) > self.max_bytes:
+            return
+        self._entries[key] = (time.monotonic() + ttl_seconds, value)
+        self._entry_bytes += self._size(value)
+        if self.max_entries is None:
+            if len(self._entries) > self._next_sweep:
+                now = time.monotonic()
+                for expired in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+                    self._discard(expired)
+                self._next_sweep = max(1024, 2 * len(self._entries))
+            return
+        while len(self._entries) > self.max_entries or (self.max_bytes is not None and self._entry_bytes > self.max_bytes):
+            self._discard(next(iter(self._entries)))
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._get_live(key)
+            if value is None:
+                return None
+            return value if isinstance(value, bytes) else str(value).encode('ascii')
+
+    def set(self, key: str, value: bytes, ttl_seconds: int = 0):
+        with self._lock:
+            self._store(key, value, ttl_seconds)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._discard(key)
+            self._persistent.pop(key, None)
+
+    def pop(self, key: str) -> Optional[bytes]:
+        """Atomically return and delete ``key`` (None when missing or expired)."""
+        with self._lock:
+            value = self._get_live(key)
+            self._discard(key)
+            self._persistent.pop(key, None)
+            if value is None:
+                return None
+            return value if isinstance(value, bytes) else str(value).encode('ascii')
+
+    def incr(self, key: str, ttl_seconds: int = 0) -> int:
+        """Increment an integer counter; ``ttl_seconds`` applies when the counter is created."""
+        with self._lock:
+            current = self._get_live(key)
+            if current is None:
+                self._store(key, 1, ttl_seconds)
+                return 1
+            value = int(current) + 1
+            if key in self._persistent:
+                self._persistent[key] = value
+            else:
+                expires_at, previous = self._entries[key]
+                self._entries[key] = (expires_at, value)
+                self._entry_bytes -= self._size(previous)
+            return value
+
+
+class RedisBackend:
+    """Redis-protocol backend shared by every worker (requires the ``redis`` package).
+
+    Connection problems are logged and treated as cache misses so an unavailable cache
+    never takes the API down. ``incr`` raises :class:`CacheUnavailable` instead (a counter has
+    no safe default), and a ``strict`` backend raises it from every call, so callers such as
+    the login rate limiter can fail closed.
+    """
+
+    def __init__(self, url: str, strict: bool = False):
+        try:
+            import redis
+        except ImportError as e:  # pragma: no cover - depends on deployment
+            raise RuntimeError('CACHE_URL points to Redis but the "redis" package is not installed') from e
+        self._errors = redis.RedisError
+        self._client = redis.Redis.from_url(url)
+        self.strict = strict
+
+    def _failed(self, operation: str, error: Exception):
+        if self.strict:
+            raise CacheUnavailable(f'Cache {operation} failed: {error}') from error
+        logger.warning('Cache %s failed: %s', operation, error)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self._client.get(key)
+        except self._errors as e:
+            self._failed('get', e)
+            return None
+
+    def set(self, key: str, value: bytes, ttl_seconds: int = 0):
+        try:
+            self._client.set(key, value, ex=ttl_seconds if ttl_seconds > 0 else None)
+        except self._errors as e:
+            self._failed('set', e)
+
+    def delete(self, key: str):
+        try:
+            self._client.delete(key)
+        except self._errors as e:
+            self._failed('delete', e)
+
+    def pop(self, key: str) -> Optional[bytes]:
+        """Atomically return and delete ``key`` (GETDEL, Redis 6.2+)."""
+        try:
+            return self._client.getdel(key)
+        except self._errors as e:
+            self._failed('pop', e)
+            return None
+
+    def incr(self, key: str, ttl_seconds: int = 0) -> int:
+        try:
+            value = self._client.incr(key)
+            if value == 1 and ttl_seconds > 0:
+                self._client.expire(key, ttl_seconds)
+            return value
+        except self._errors as e:
+            raise CacheUnavailable(f'Cache incr failed: {e}') from e
+
+
+def create_backend(url: Optional[str], max_entries: Optional[int] = 1024, strict: bool = False, max_bytes: Optional[int] = None):
+    """Build the backend selected by ``CACHE_URL`` (unset/``memory://`` or ``redis://...``)."""
+    if not url or url.startswith('memory://'):
+        return MemoryBackend(max_entries=max_entries, max_bytes=max_bytes)
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisBackend(url, strict=strict)
+    raise RuntimeError(f'Unsupported CACHE_URL scheme: {url}')
+
+
+class ResponseCache:
+    """Serialized responses stored in a backend under a versioned namespace.
+
+    ``invalidate`` bumps the namespace version instead of deleting keys, which works the
+    same for every backend and makes a write in one worker visible to all of them.
+    A ``ttl_seconds`` of 0 disables caching.
+    """
+
+    def __init__(self, backend, namespace: str, ttl_seconds: int = 60):
+        self.backend = backend
+        self.namespace = namespace
+        self.ttl_seconds = max(0, ttl_seconds)
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def _version_key(self) -> str:
+        return f'{self.namespace}:version'
+
+    def version(self) -> int:
+        raw = self.backend.get(self._version_key())
+        return int(raw) if raw else 0
+
+    def key_for(self, request_key: str) -> str:
+        """Resolve a request key against the current version.
+
+        Resolve once per request and reuse the result for ``get`` and ``set`` so a response
+        built while a write happens is stored under the old, already invalidated version.
+        """
+        digest = hashlib.sha256(request_key.encode('utf-8')).hexdigest()
+        return f'{self.namespace}:{self.version()}:{digest}'
+
+    def get(self, key: str) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        return self.backend.get(key)
+
+    def set(self, key: str, value: bytes):
+        if not self.enabled:
+            return
+        self.backend.set(key, value, self.ttl_seconds)
+
+    def invalidate(self):
+        try:
+            self.backend.incr(self._version_key())
+        except CacheUnavailable as e:
+            # Entries still expire after ttl_seconds.
+            logger.warning('Could not invalidate %s cache: %s', self.namespace, e)
@@ -0,0 +1,79 @@
+"""CAPTCHA verification backends used by the post create/update routes.
+
+``CAPTCHA_VERIFIER`` selects the implementation: ``hcaptcha`` (default) calls the hCaptcha
+siteverify API, ``stub`` accepts every token locally (optionally after a simulated delay) so
+the create path can be load-tested offline. Either one is wrapped in :class:`CachingVerifier`,
+which remembers a successful verification for a short time so a client retrying a failed
+request with the same token does not trigger another round-trip. The entry is bound to the
+client fingerprint and is good for one reuse, and callers ``forget`` it once the write succeeded,
+so a solved token cannot be replayed.
+"""
+import hashlib
+import json
+import time
+
+
+class HCaptchaVerifier:
+    def __init__(self, client, url: str, secret: str):
+        self.client = client
+        self.url = url
+        self.secret = secret
+
+    def verify(self, token: str) -> dict:
+        """Return hCaptcha's verification result; raises requests.RequestException/ValueError on transport errors."""
+        response = self.client.post(self.url, data={'secret': self.secret, 'response': token})
+        return response.json()
+
+
+class StubVerifier:
+    """Accepts any token without network access. For local development and load tests only."""
+
+    def __init__(self, latency_ms: int = 0):
+        self.latency_ms = latency_ms
+
+    def verify(self, token: str) -> dict:
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000.0)
+        return {'success': True, 'stub': True}
+
+
+class CachingVerifier:
+    """Caches successful verifications by token hash and client fingerprint in a cache backend (see cache.py)."""
+
+    def __init__(self, inner, backend, ttl_seconds: int = 120):
+        self.inner = inner
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+
+    def _key(self, token: str, client_key: bytes) -> str:
+        return 'captcha:' + hashlib.sha256(client_key + b'\0' + token.encode('utf-8')).hexdigest()
+
+    def verify(self, token: str, client_key: bytes = b'') -> dict:
+        """``client_key`` binds a cached success to the client (e.g. the IP+UA fingerprint)."""
+        key = self._key(token, client_key)
+        if self.ttl_seconds > 0:
+            # pop, not get + delete: two concurrent requests must not both consume one entry.
+            cached = self.backend.pop(key)
+            if cached is not None:
+                return json.loads(cached)
+
+        result = self.inner.verify(token)
+        # Failures are not cached, so a transient upstream problem cannot pin a rejection.
+        if self.ttl_seconds > 0 and result.get('success'):
+            self.backend.set(key, json.dumps(result).encode('utf-8'), self.ttl_seconds)
+        return result
+
+    def forget(self, token: str, client_key: bytes = b''):
+        """Drop the cached success once the request it was verified for has succeeded."""
+        if self.ttl_seconds > 0:
+            self.backend.delete(self._key(token, client_key))
+
+
+def create_verifier(kind: str, backend, cache_ttl_seconds: int, client=None, url: str = None, secret: str = None, stub_latency_ms: int = 0):
+    if kind == 'stub':
+        inner = StubVerifier(latency_ms=stub_latency_ms)
+    elif kind == 'hcaptcha':
+        inner = HCaptchaVerifier(client, url, secret)
+    else:
+        raise RuntimeError(f'Unknown CAPTCHA_VERIFIER: {kind}')
+    return CachingVerifier(inner, backend, ttl_seconds=cache_ttl_seconds)
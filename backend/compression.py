@@ -0,0 +1,101 @@
+import gzip
+import mimetypes
+import os
+from typing import Optional
+
+from flask import request, send_from_directory
+from werkzeug.security import safe_join
+
+try:
+    import brotli  # Optional: enables on-the-fly "br" for API responses
+except ImportError:  # pragma: no cover - depends on deployment
+    brotli = None
+
+# Build output ships the Canada outline as .geojson, which Python does not know about.
+mimetypes.add_type('application/geo+json', '.geojson')
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/geo+json', 'application/x-ndjson'}
+
+# Precompressed siblings written at build time by precompress_static.py, in preference order.
+PRECOMPRESSED_SUFFIXES = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _accepts(encoding: str) -> bool:
+    return request.accept_encodings[encoding] > 0
+
+
+def accepted_encoding() -> Optional[str]:
+    """The encoding to send this request: ``br`` (when brotli is installed), ``gzip`` or None."""
+    return 'br' if brotli is not None and _accepts('br') else 'gzip' if _accepts('gzip') else None
+
+
+def _compress(data: bytes, encoding: str, level: int) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=min(level, 11))
+    return gzip.compress(data, compresslevel=level)
+
+
+def precompress(data: bytes, encoding: str) -> bytes:
+    """Encode a body that is compressed once and served many times, at the levels
+    precompress_static.py uses for static assets."""
+    if encoding == 'br':
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def init_compression(app, min_size: int = 1024, level: int = 6):
+    """Compress JSON API responses of at least ``min_size`` bytes when the client accepts it.
+
+    Responses that already carry a ``Content-Encoding`` (e.g. the boundary outline, which is
+    encoded once per zoom level) are sent as they are.
+    """
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        encoding = accepted_encoding()
+        response.vary.add('Accept-Encoding')
+        if encoding is None:
+            return response
+
+        response.set_data(_compress(data, encoding, level))
+        response.headers['Content-Encoding'] = encoding
+        # The encoded bytes differ from the identity representation, so a strong ETag
+        # becomes weak (If-None-Match uses weak comparison, so revalidation still works).
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+def send_static_file(directory: str, path: str):
+    """Serve ``path`` from ``directory``, preferring a precompressed ``.br``/``.gz`` sibling."""
+    has_variant = False
+    for encoding, suffix in PRECOMPRESSED_SUFFIXES:
+        candidate = safe_join(directory, path + suffix)
+        if candidate is None or not os.path.isfile(candidate):
+            continue
+        has_variant = True
+        if _accepts(encoding):
+            mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+            response = send_from_directory(directory, path + suffix, mimetype=mimetype)
+            response.headers['Content-Encoding'] = encoding
+            response.vary.add('Accept-Encoding')
+            return response
+
+    response = send_from_directory(directory, path)
+    if has_variant:
+        response.vary.add('Accept-Encoding')
+    return response
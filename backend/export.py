@@ -0,0 +1,133 @@
+"""Story serialisation and the streaming data export shared by the API and ``export_stories.py``.
+
+:func:`serialize_post` is the normalisation every read endpoint applies (camelCase keys, string
+ids, ISO dates). :func:`iter_export` streams approved stories from a server-side cursor as a
+GeoJSON FeatureCollection, CSV or NDJSON, one batch at a time, so a full dump never holds the
+collection in memory. The CSV columns are the ones ``ingest.py`` reads, so a CSV export can be
+re-imported.
+
+Exports are unsorted (sorting would need a blocking sort or a second index per filter). For
+incremental exports pass ``since``: it selects stories created *or* updated at or after that
+time (an approval in the admin sets ``updated_at``). Use the time an export started as the next
+``since``; a story written during the export may then appear in both, so dedupe on ``_id``.
+"""
+import datetime
+from typing import Callable, Iterable, Iterator, Optional
+
+from ingest import CSV_LIST_SEPARATOR
+from streaming import iter_csv, iter_feature_collection, iter_ndjson
+
+EXPORT_FORMATS = ('geojson', 'csv', 'ndjson')
+EXPORT_MIMETYPES = {
+    'geojson': 'application/geo+json',
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+# Cursor batch size for exports
+EXPORT_BATCH_SIZE = 500
+
+# API field name -> stored field names, used for ``fields=`` projections
+POST_FIELD_STORAGE = {
+    'title': ['title'],
+    'content': ['content'],
+    'location': ['location'],
+    'tag': ['tag'],
+    'optionalTags': ['optional_tags', 'optionalTags'],
+    'storyPrompt': ['story_prompt', 'storyPrompt'],
+    'createdAt': ['created_at', 'createdAt'],
+    'updatedAt': ['updated_at'],
+    'imageStatus': ['image_status'],
+}
+# Stored fields an export reads: every public API field.
+EXPORT_PROJECTION = {stored_name: 1 for stored_names in POST_FIELD_STORAGE.values() for stored_name in stored_names}
+CSV_COLUMNS = ['_id', 'title', 'description', 'image', 'longitude', 'latitude', 'tag', 'optionalTags',
+               'storyPrompt', 'createdAt', 'updatedAt']
+
+
+def serialize_post(post: dict, fields: Optional[list] = None) -> dict:
+    """Normalise a stories document for the frontend (camelCase keys, string ids, ISO dates).
+
+    ``updatedAt`` is only present once a story has been edited or moderated.
+
+    When ``fields`` is given, only those API fields (plus ``_id``) are returned.
+    """
+    post['_id'] = str(post['_id'])
+    # Handle date field conversion - check both formats
+    if 'created_at' in post:
+        created_at = post.pop('created_at')
+        # Convert datetime object to ISO string if needed
+        if isinstance(created_at, datetime.datetime):
+            post['createdAt'] = created_at.isoformat()
+        else:
+            post['createdAt'] = created_at
+    elif 'createdAt' not in post:
+        # If no date field exists, use current time as fallback
+        post['createdAt'] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    if 'updated_at' in post:
+        updated_at = post.pop('updated_at')
+        post['updatedAt'] = updated_at.isoformat() if isinstance(updated_at, datetime.datetime) else updated_at
+    # Convert optional_tags to optionalTags for frontend compatibility
+    if 'optional_tags' in post:
+        post['optionalTags'] = post.pop('optional_tags')
+    elif 'optionalTags' not in post:
+        post['optionalTags'] = []
+
+    # Convert story_prompt to storyPrompt for frontend compatibility
+    if 'story_prompt' in post:
+        post['storyPrompt'] = post.pop('story_prompt')
+
+    # Set while a background image upload is pending or has failed (see image_jobs.py)
+    if 'image_status' in post:
+        post['imageStatus'] = post.pop('image_status')
+
+    if fields:
+        return {key: value for key, value in post.items() if key == '_id' or key in fields}
+    return post
+
+
+def export_query(query: dict, since: Optional[datetime.datetime] = None) -> dict:
+    """Add the incremental ``since`` condition to a ``build_post_query`` filter."""
+    if since is None:
+        return query
+    changed = {'$or': [{'created_at': {'$gte': since}}, {'updated_at': {'$gte': since}}]}
+    query = dict(query)
+    query['$and'] = list(query.get('$and', [])) + [changed]
+    return query
+
+
+def find_for_export(collection, query: dict, since: Optional[datetime.datetime] = None):
+    return collection.find(export_query(query, since), EXPORT_PROJECTION, batch_size=EXPORT_BATCH_SIZE)
+
+
+def _to_feature(post: dict) -> dict:
+    properties = {key: value for key, value in post.items() if key not in ('_id', 'location')}
+    return {'type': 'Feature', 'id': post['_id'], 'geometry': post.get('location'), 'properties': properties}
+
+
+def _to_csv_row(post: dict) -> list:
+    content = post.get('content') or {}
+    coordinates = (post.get('location') or {}).get('coordinates') or [None, None]
+    return [
+        post['_id'],
+        post.get('title'),
+        content.get('description'),
+        content.get('image'),
+        coordinates[0],
+        coordinates[1],
+        post.get('tag'),
+        CSV_LIST_SEPARATOR.join(post.get('optionalTags') or []),
+        post.get('storyPrompt'),
+        post.get('createdAt'),
+        post.get('updatedAt'),
+    ]
+
+
+def iter_export(cursor: Iterable[dict], fmt: str, dumps: Callable[[dict], str]) -> Iterator[bytes]:
+    """Encode the documents of an export cursor in ``fmt`` (one of EXPORT_FORMATS)."""
+    posts = (serialize_post(post) for post in cursor)
+    if fmt == 'csv':
+        return iter_csv((_to_csv_row(post) for post in posts), CSV_COLUMNS)
+    if fmt == 'ndjson':
+        return iter_ndjson(posts, dumps)
+    # Stories without a location get a null geometry.
+    return iter_feature_collection((_to_feature(post) for post in posts), dumps)
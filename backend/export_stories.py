@@ -0,0 +1,68 @@
+"""Dump approved stories from MongoDB as GeoJSON, CSV or NDJSON (same output as GET /api/posts/export).
+
+Streams from a server-side cursor (see export.py), so memory use does not grow with the
+collection. For an incremental dump pass the "started at" time printed by the previous run as
+``--since``; stories written while an export runs may appear in both, so dedupe on ``_id``.
+
+Usage: python export_stories.py stories.geojson [--format geojson|csv|ndjson] [--tag ...]
+       [--optional-tag ...] [--story-prompt ...] [--since 2026-01-01T00:00:00+00:00]
+       (reads MONGODB_URI; '-' writes to stdout)
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+
+from marshmallow import ValidationError
+from pymongo import MongoClient
+
+from export import EXPORT_FORMATS, find_for_export, iter_export
+from queries import build_post_query
+from schemas import TagSchema
+
+
+def _since(value: str) -> datetime.datetime:
+    try:
+        since = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'not an ISO 8601 time: {value!r}')
+    return since if since.tzinfo else since.replace(tzinfo=datetime.timezone.utc)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('path', help="output file, or '-' for stdout")
+    parser.add_argument('--format', choices=EXPORT_FORMATS, help='default: from the file extension, else geojson')
+    parser.add_argument('--tag')
+    parser.add_argument('--optional-tag', action='append', default=[], help='repeat for several (all must match)')
+    parser.add_argument('--story-prompt')
+    parser.add_argument('--since', type=_since, help='only stories created or updated at or after this time')
+    args = parser.parse_args()
+
+    try:
+        filters = TagSchema().load({'tag': args.tag, 'optionalTags': args.optional_tag, 'storyPrompt': args.story_prompt})
+    except ValidationError as err:
+        parser.error(json.dumps(err.messages))
+
+    uri = os.getenv('MONGODB_URI')
+    if not uri:
+        sys.exit('MONGODB_URI is not set')
+    db = MongoClient(uri).get_default_database('test')
+
+    extension = os.path.splitext(args.path)[1].lstrip('.').lower()
+    fmt = args.format or (extension if extension in EXPORT_FORMATS else 'geojson')
+    query = build_post_query(filters.get('tag'), filters.get('optionalTags'), filters.get('storyPrompt'))
+    started_at = datetime.datetime.now(datetime.timezone.utc)
+
+    output = sys.stdout.buffer if args.path == '-' else open(args.path, 'wb')
+    with output:
+        for chunk in iter_export(find_for_export(db.stories, query, args.since), fmt, json.dumps):
+            output.write(chunk)
+
+    print(f'export started at {started_at.isoformat()} (pass as --since for the next incremental export)', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
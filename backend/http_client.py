@@ -0,0 +1,113 @@
+"""Shared outbound HTTP clients for third-party services (hCaptcha, ImgBB).
+
+Each :class:`HttpClient` keeps a pooled keep-alive ``requests.Session`` so repeated calls reuse
+TLS connections, applies connect/read timeouts to every request, retries connection failures
+(and gateway errors on idempotent requests), and wraps the upstream in a circuit breaker so a
+hung or failing service is skipped quickly instead of tying up gunicorn workers.
+"""
+import threading
+import time
+from typing import Callable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised without contacting the upstream while its circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures and allows one trial call per ``reset_seconds``."""
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at >= self.reset_seconds:
+                # Half-open: let one request through; its outcome closes or re-opens the circuit.
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class HttpClient:
+    def __init__(
+        self,
+        name: str,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10.0,
+        retries: int = 2,
+        pool_size: int = 10,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+        on_complete: Optional[Callable[[str, float, str], None]] = None,
+    ):
+        self.name = name
+        # Called with (name, seconds, outcome) after every call, e.g. metrics.observe_external_call.
+        self.on_complete = on_complete
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = CircuitBreaker(failure_threshold, reset_seconds)
+        # Retry connection errors (the request never reached the upstream) for every method,
+        # but gateway failures only for idempotent methods (the default allowed_methods): a
+        # read timeout or a 504 on a POST may mean the upstream already acted on it (e.g.
+        # consumed a one-time CAPTCHA token or stored an image).
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=retries,
+            status_forcelist=(502, 503, 504),
+            backoff_factor=0.3,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        if not self.breaker.allow():
+            self._report(0.0, 'circuit_open')
+            raise CircuitOpenError(f'{self.name} is unavailable (circuit open)')
+        kwargs.setdefault('timeout', self.timeout)
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            self.breaker.record_failure()
+            self._report(time.perf_counter() - started, 'exception')
+            raise
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+            self._report(time.perf_counter() - started, 'server_error')
+        else:
+            self.breaker.record_success()
+            self._report(time.perf_counter() - started, 'ok')
+        return response
+
+    def _report(self, seconds: float, outcome: str):
+        if self.on_complete is not None:
+            self.on_complete(self.name, seconds, outcome)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
@@ -0,0 +1,171 @@
+"""Background image uploads for newly created stories.
+
+``create`` stores the story straight away with ``image_status: 'pending'`` and hands the image
+bytes to :class:`ImageUploadQueue`. The job (including the bytes) is persisted in Mongo so a
+restarted worker can pick it up again; a small thread pool re-encodes the image once (``process``),
+uploads it to the CDN with retries and exponential backoff, then patches ``content.image`` (and
+``content.thumbnail``) on the story. An image ``process`` rejects fails at once, without retries.
+A sweeper thread periodically reschedules jobs whose worker died mid-upload (lease expired), so
+they do not wait for the next process start. The API exposes ``image_status`` as ``imageStatus``.
+"""
+import datetime
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from bson.binary import Binary
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+
+from image_processing import ImageRejected
+
+logger = logging.getLogger(__name__)
+
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+class ImageUploadQueue:
+    def __init__(
+        self,
+        jobs_collection,
+        stories_collection,
+        upload: Callable[[object], Optional[dict]],
+        on_complete: Optional[Callable[[], None]] = None,
+        process: Optional[Callable[[str, bytes, Optional[str]], object]] = None,
+        max_workers: int = 2,
+        max_attempts: int = 5,
+        backoff_seconds: float = 2.0,
+        lease_seconds: int = 300,
+        sweep_seconds: Optional[float] = None,
+    ):
+        self.jobs = jobs_collection
+        self.stories = stories_collection
+        # process(filename, data, content_type) prepares what upload() sends (default: the raw tuple)
+        self.upload = upload
+        self.process = process
+        self.on_complete = on_complete
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.lease_seconds = lease_seconds
+        # Default: check twice per lease period, so an abandoned job waits at most 1.5 leases.
+        self.sweep_seconds = sweep_seconds if sweep_seconds is not None else lease_seconds / 2
+        self._executor = None
+        self._lock = threading.Lock()
+        # Jobs queued in this process's pool; the sweep does not queue them a second time.
+        self._scheduled = set()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Created lazily so threads start in the serving process (after any gunicorn fork).
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='image-upload')
+                threading.Thread(target=self._sweep_forever, name='image-upload-sweep', daemon=True).start()
+            return self._executor
+
+    def _submit(self, job_id):
+        with self._lock:
+            if job_id in self._scheduled:
+                return
+            self._scheduled.add(job_id)
+        self._executor.submit(self._run, job_id)
+
+    def start(self):
+        """Start the worker pool and the sweeper (idempotent); the first sweep reschedules jobs left by earlier processes."""
+        self._get_executor()
+
+    def enqueue(self, post_id, filename: str, content_type: Optional[str], data: bytes):
+        """Persist an upload job for ``post_id`` and schedule it."""
+        job = {
+            'post_id': post_id,
+            'filename': filename,
+            'content_type': content_type,
+            'data': Binary(data),
+            'status': 'pending',
+            'attempts': 0,
+            'created_at': _now(),
+        }
+        job_id = self.jobs.insert_one(job).inserted_id
+        self._get_executor()
+        self._submit(job_id)
+        return job_id
+
+    def _sweep_forever(self):
+        while True:
+            try:
+                self._resume_pending()
+            except Exception:
+                # Keep sweeping: a dead sweeper would strand every job whose worker died.
+                logger.exception('Image upload lease sweep failed')
+            time.sleep(self.sweep_seconds)
+
+    def _resume_pending(self):
+        """Reschedule jobs left behind by this or another process (pending, or running with an expired lease)."""
+        try:
+            stale = _now() - datetime.timedelta(seconds=self.lease_seconds)
+            for job in self.jobs.find(
+                {'$or': [{'status': 'pending'}, {'status': 'running', 'leased_at': {'$lt': stale}}]},
+                {'_id': 1},
+            ):
+                self._submit(job['_id'])
+        except PyMongoError as e:
+            logger.warning('Could not resume image upload jobs: %s', e)
+
+    def _claim(self, job_id):
+        stale = _now() - datetime.timedelta(seconds=self.lease_seconds)
+        return self.jobs.find_one_and_update(
+            {'_id': job_id, '$or': [{'status': 'pending'}, {'status': 'running', 'leased_at': {'$lt': stale}}]},
+            {'$set': {'status': 'running', 'leased_at': _now()}},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def _run(self, job_id):
+        try:
+            job = self._claim(job_id)
+            if job is None:
+                return  # Already handled by another worker.
+
+            image = (job['filename'], bytes(job['data']), job.get('content_type'))
+            try:
+                # Once per job: retries below only repeat the upload.
+                prepared = self.process(*image) if self.process is not None else image
+            except ImageRejected as e:
+                # Deterministic; retrying cannot help.
+                logger.warning('Image upload job %s rejected: %s', job_id, e)
+                self._finish(job, None)
+                return
+
+            uploaded = None
+            attempts = job.get('attempts', 0)
+            while uploaded is None and attempts < self.max_attempts:
+                if attempts:
+                    time.sleep(self.backoff_seconds * (2 ** (attempts - 1)))
+                attempts += 1
+                self.jobs.update_one({'_id': job_id}, {'$set': {'attempts': attempts, 'leased_at': _now()}})
+                uploaded = self.upload(prepared)
+
+            self._finish(job, uploaded)
+        except Exception:
+            logger.exception('Image upload job %s crashed', job_id)
+        finally:
+            with self._lock:
+                self._scheduled.discard(job_id)
+
+    def _finish(self, job: dict, uploaded: Optional[dict]):
+        if uploaded:
+            fields = {f'content.{key}': value for key, value in uploaded.items()}
+            fields.update({'image_status': 'ready', 'updated_at': _now()})
+            self.stories.update_one({'_id': job['post_id']}, {'$set': fields})
+            job_update = {'status': 'done', 'finished_at': _now()}
+        else:
+            self.stories.update_one({'_id': job['post_id']}, {'$set': {'image_status': 'failed', 'updated_at': _now()}})
+            job_update = {'status': 'failed', 'finished_at': _now()}
+
+        # The image now lives on the CDN (or will never get there); drop the stored bytes.
+        self.jobs.update_one({'_id': job['_id']}, {'$set': job_update, '$unset': {'data': ''}})
+        if self.on_complete is not None:
+            self.on_complete()
@@ -0,0 +1,96 @@
+"""Normalise story images before they are sent to the CDN.
+
+Uploads are re-encoded (which drops EXIF/GPS metadata), downsized to ``MAX_DIMENSION`` and
+paired with a small thumbnail for map popups and the admin list. An image that cannot be
+re-encoded, or that is larger than ``MAX_SOURCE_PIXELS``, raises :class:`ImageRejected` rather
+than being uploaded with its metadata; :func:`check_image` applies the cheap part of those checks
+(header and dimensions only) while the request is still open. Animated GIFs (which carry no
+EXIF) are uploaded unchanged. Pillow is optional: without it the original bytes are uploaded
+unchanged and no thumbnail is produced.
+"""
+import io
+import logging
+import os
+from typing import NamedTuple, Optional
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - depends on deployment
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+MAX_DIMENSION = 1600
+THUMBNAIL_DIMENSION = 320
+WEBP_QUALITY = 80
+THUMBNAIL_QUALITY = 70
+# Larger sources are rejected before decoding (a 5 MB file can declare gigapixel dimensions).
+# 50 megapixels covers current phone cameras.
+MAX_SOURCE_PIXELS = 50_000_000
+
+if Image is not None:
+    # Pillow's own guard (about 89 megapixels by default) also covers formats opened elsewhere.
+    Image.MAX_IMAGE_PIXELS = MAX_SOURCE_PIXELS
+
+
+class ImageRejected(ValueError):
+    """The upload is not an image that can be safely re-encoded."""
+
+
+class ProcessedImage(NamedTuple):
+    """``(filename, bytes, content_type)`` tuples, ready to be passed to the CDN upload."""
+    image: tuple
+    thumbnail: Optional[tuple]
+
+
+def _encode_webp(image, max_dimension: int, quality: int) -> bytes:
+    resized = image.copy()
+    resized.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+    buffer = io.BytesIO()
+    # No exif=/icc_profile= arguments: the encoded file carries no metadata.
+    resized.save(buffer, format='WEBP', quality=quality, method=4)
+    return buffer.getvalue()
+
+
+def _open(data: bytes):
+    """Open ``data`` lazily (header only) and enforce the pixel cap; raises ImageRejected."""
+    try:
+        source = Image.open(io.BytesIO(data))
+    except Exception as e:
+        raise ImageRejected(f'not a readable image: {e}') from e
+    width, height = source.size
+    if width * height > MAX_SOURCE_PIXELS:
+        source.close()
+        raise ImageRejected(f'image is {width}x{height}; the limit is {MAX_SOURCE_PIXELS} pixels')
+    return source
+
+
+def check_image(data: bytes) -> None:
+    """Reject unreadable or oversized images without decoding the pixels; raises ImageRejected."""
+    if Image is not None:
+        _open(data).close()
+
+
+def process_image(filename: str, data: bytes, content_type: Optional[str]) -> ProcessedImage:
+    """Re-encode an upload; raises ImageRejected instead of returning bytes with metadata."""
+    original = (filename, data, content_type)
+    if Image is None:
+        return ProcessedImage(original, None)
+
+    with _open(data) as source:
+        if source.format == 'GIF' and getattr(source, 'is_animated', False):
+            return ProcessedImage(original, None)
+        try:
+            # Apply the EXIF orientation before the metadata is dropped. Other animated
+            # formats keep only their first frame.
+            image = ImageOps.exif_transpose(source)
+            has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+
+            stem = os.path.splitext(os.path.basename(filename))[0] or 'image'
+            main = (f'{stem}.webp', _encode_webp(image, MAX_DIMENSION, WEBP_QUALITY), 'image/webp')
+            thumbnail = (f'{stem}-thumb.webp', _encode_webp(image, THUMBNAIL_DIMENSION, THUMBNAIL_QUALITY), 'image/webp')
+        except Exception as e:
+            raise ImageRejected(f'could not re-encode image: {e}') from e
+
+    return ProcessedImage(main, thumbnail)
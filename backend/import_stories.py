@@ -0,0 +1,51 @@
+"""Import pre-moderated stories from an NDJSON or CSV file straight into MongoDB.
+
+Uses the same validation and chunked ``insert_many`` as ``POST /api/posts/bulk`` (see
+ingest.py), without the request size limit. Rows default to ``status: approved``.
+
+Usage: python import_stories.py stories.csv [--format csv|ndjson] [--dry-run]   (reads MONGODB_URI)
+"""
+import argparse
+import json
+import os
+import sys
+
+from pymongo import MongoClient
+
+from ingest import IMPORT_FORMATS, detect_format, ingest_rows, parse_rows, text_lines
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('path', help="file to import, or '-' for stdin")
+    parser.add_argument('--format', choices=IMPORT_FORMATS, help='default: from the file extension (.csv), else ndjson')
+    parser.add_argument('--dry-run', action='store_true', help='validate only')
+    args = parser.parse_args()
+
+    uri = os.getenv('MONGODB_URI')
+    if not uri:
+        sys.exit('MONGODB_URI is not set')
+    db = MongoClient(uri).get_default_database('test')
+
+    fmt = args.format or detect_format(None, args.path)
+    stream = sys.stdin.buffer if args.path == '-' else open(args.path, 'rb')
+    with stream:
+        result = ingest_rows(db.stories, parse_rows(text_lines(stream), fmt), dry_run=args.dry_run)
+
+    if result.inserted and not args.dry_run:
+        # Same document app._mark_posts_changed bumps; running servers drop cached listings.
+        db.collection_versions.update_one(
+            {'_id': 'stories'},
+            {'$inc': {'version': 1}, '$currentDate': {'updated_at': True}},
+            upsert=True,
+        )
+
+    for error in result.errors:
+        print(f"row {error.row}: {json.dumps(error.errors)}", file=sys.stderr)
+    verb = 'valid' if args.dry_run else 'imported'
+    print(f"{result.inserted} {verb}, {len(result.errors)} rejected")
+    return 1 if result.errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
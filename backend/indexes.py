@@ -0,0 +1,129 @@
+"""Index declarations for the Mongo collections the app queries, created at startup.
+
+Every index the request paths rely on is declared in ``INDEXES`` next to the query shape it
+serves. :func:`ensure_indexes` creates them idempotently (``create_index`` is a no-op for an
+index that already exists with the same keys and options), and :func:`index_report` uses
+``$indexStats`` to list declared indexes that are missing, declared indexes that have not been
+used since the server started, and undeclared indexes that only cost write time.
+
+Usage: python indexes.py [--report]   (reads MONGODB_URI, creates indexes, optionally reports)
+"""
+import logging
+import os
+import sys
+from typing import Dict, List
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import ConnectionFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# collection -> [(keys, options)]. Listing queries always sort on POSTS_SORT
+# (created_at desc, _id desc), so the equality fields come first and the sort keys last.
+INDEXES: Dict[str, List[tuple]] = {
+    'stories': [
+        # GET /api/posts with no filters; the admin list filtered or sorted by status.
+        ([('status', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)], {'name': 'status_created'}),
+        # GET /api/posts?tag=... and the admin tag filter, both newest first. The admin filter has
+        # no status condition, so status is left out (a status key would sit between tag and the
+        # sort keys unbounded, and the sort could not be read from the index); the listing checks
+        # status on the fetched story, and most stories are approved.
+        ([('tag', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)], {'name': 'tag_created'}),
+        # GET /api/posts?optionalTags=... ($all); multikey on the tag array.
+        ([('status', ASCENDING), ('optional_tags', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)], {'name': 'status_optional_tags_created'}),
+        # GET /api/posts?storyPrompt=... and the admin story prompt filter (status left out as above).
+        ([('story_prompt', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)], {'name': 'story_prompt_created'}),
+        # Combined filters. Each single-filter index above would fetch every story matching its
+        # own filter and discard most of them; these check both filters on index keys. With all
+        # three filters the planner picks whichever of these bounds the scan tighter.
+        ([('tag', ASCENDING), ('status', ASCENDING), ('optional_tags', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)],
+         {'name': 'tag_status_optional_tags_created'}),
+        ([('story_prompt', ASCENDING), ('status', ASCENDING), ('optional_tags', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)],
+         {'name': 'story_prompt_status_optional_tags_created'}),
+        ([('tag', ASCENDING), ('story_prompt', ASCENDING), ('status', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)],
+         {'name': 'tag_story_prompt_status_created'}),
+        # GET /api/posts/export?since=...: the updated_at branch of its created-or-updated $or
+        # (the created_at branch uses the status_created family above).
+        ([('status', ASCENDING), ('updated_at', ASCENDING)], {'name': 'status_updated'}),
+        # Admin list sorted by date (or title, with _id as tie-breaker) and its created_at / title filters.
+        ([('created_at', DESCENDING), ('_id', DESCENDING)], {'name': 'created'}),
+        ([('title', ASCENDING), ('_id', ASCENDING)], {'name': 'title_id'}),
+        # GET /api/posts/search and the admin search box ($text; a collection has one text index).
+        # Stories are written in English and French, so no stemming or stop words.
+        ([('title', 'text'), ('content.description', 'text'), ('optional_tags', 'text')],
+         {'name': 'story_text', 'weights': {'title': 5, 'optional_tags': 3, 'content.description': 1}, 'default_language': 'none'}),
+        # bbox / center+radius filters ($geoWithin / $nearSphere) and /api/posts/clusters.
+        ([('location', '2dsphere')], {'name': 'location_2dsphere'}),
+    ],
+    'users': [
+        # verify_user / create_user look users up by name; duplicates must never exist.
+        ([('username', ASCENDING)], {'name': 'username_unique', 'unique': True}),
+    ],
+    'image_jobs': [
+        # ImageUploadQueue._resume_pending: pending jobs and running jobs with an expired lease.
+        ([('status', ASCENDING), ('leased_at', ASCENDING)], {'name': 'status_leased_at'}),
+    ],
+}
+
+
+def ensure_indexes(db, indexes: Dict[str, List[tuple]] = INDEXES) -> int:
+    """Create every declared index; returns how many could not be created (each is logged).
+
+    Stops at the first connection failure (e.g. server selection timing out) instead of waiting
+    out the timeout once per index.
+    """
+    failed = 0
+    specs_left = sum(len(specs) for specs in indexes.values())
+    for collection_name, specs in indexes.items():
+        for keys, options in specs:
+            specs_left -= 1
+            try:
+                db[collection_name].create_index(keys, **options)
+            except ConnectionFailure as e:
+                logger.warning('Could not reach MongoDB to create indexes; skipping the remaining %d: %s', specs_left + 1, e)
+                return failed + specs_left + 1
+            except PyMongoError as e:
+                # e.g. an existing index with the same keys under another name, or duplicate usernames.
+                failed += 1
+                logger.warning('Could not create index %s.%s: %s', collection_name, options['name'], e)
+    return failed
+
+
+def index_report(db, indexes: Dict[str, List[tuple]] = INDEXES) -> Dict[str, dict]:
+    """Compare declared indexes with the server's ``$indexStats`` for each collection.
+
+    Returns ``{collection: {'missing': [...], 'unused': [...], 'undeclared': [...]}}``. Usage
+    counters reset when mongod restarts, so "unused" is only meaningful on a long-running server.
+    """
+    report = {}
+    for collection_name, specs in indexes.items():
+        declared = {options['name'] for _, options in specs}
+        stats = {stat['name']: stat for stat in db[collection_name].aggregate([{'$indexStats': {}}])}
+        report[collection_name] = {
+            'missing': sorted(declared - stats.keys()),
+            'unused': sorted(name for name in declared & stats.keys() if not stats[name]['accesses']['ops']),
+            'undeclared': sorted(name for name in stats.keys() - declared if name != '_id_'),
+        }
+    return report
+
+
+def print_index_report(db):
+    for collection_name, entry in index_report(db).items():
+        for kind in ('missing', 'unused', 'undeclared'):
+            for name in entry[kind]:
+                print(f"{collection_name}.{name}: {kind}")
+        if not any(entry.values()):
+            print(f"{collection_name}: ok")
+
+
+if __name__ == '__main__':
+    from pymongo import MongoClient
+
+    uri = os.getenv('MONGODB_URI')
+    if not uri:
+        sys.exit('MONGODB_URI is not set')
+    database = MongoClient(uri).get_default_database('test')
+    failures = ensure_indexes(database)
+    if '--report' in sys.argv[1:]:
+        print_index_report(database)
+    sys.exit(1 if failures else 0)
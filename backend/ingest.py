@@ -0,0 +1,165 @@
+"""Bulk story ingestion shared by ``POST /api/posts/bulk`` and the ``import_stories.py`` CLI.
+
+Rows arrive as NDJSON (one create-API-shaped object per line) or CSV with flat columns
+(``title, description, image, longitude, latitude, tag, optionalTags, storyPrompt, createdAt,
+status``; ``optionalTags`` separated by ``|``; a ``'`` the CSV export put before a leading formula
+character is removed). They are validated with
+:class:`schemas.BulkPostSchema` one chunk at a time and written with
+``insert_many(ordered=False)``, so a bad row never blocks the rest of the import. Problems are
+reported per row: the line number for NDJSON, the data row (header excluded) for CSV.
+"""
+import csv
+import datetime
+import io
+import json
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from marshmallow import ValidationError
+from pymongo.errors import BulkWriteError
+
+from schemas import BulkPostSchema
+from streaming import CSV_FORMULA_PREFIXES
+
+CHUNK_SIZE = 500
+CSV_LIST_SEPARATOR = '|'
+IMPORT_FORMATS = ('ndjson', 'csv')
+
+bulk_post_schema = BulkPostSchema(many=True)
+
+
+class RowError(NamedTuple):
+    row: int
+    errors: object
+
+
+class IngestResult(NamedTuple):
+    inserted: int
+    errors: List[RowError]
+
+
+def parse_ndjson(lines: Iterable[str]) -> Iterator[Tuple[int, object]]:
+    """Yield ``(line number, data)``; data is the decoded object or a RowError for unparseable lines."""
+    for row, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield row, json.loads(line)
+        except ValueError as e:
+            yield row, RowError(row, {'_row': [f'Invalid JSON: {e}']})
+
+
+def _csv_number(value: str):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value  # left for schema validation to reject
+
+
+def _csv_text(value: str) -> str:
+    # Undo streaming._csv_cell, so an exported file imports unchanged.
+    if value.startswith("'") and value[1:].startswith(CSV_FORMULA_PREFIXES):
+        return value[1:]
+    return value
+
+
+def _csv_row_to_post(record: dict) -> dict:
+    get = lambda name: _csv_text((record.get(name) or '').strip())
+    content = {'description': get('description')}
+    if get('image'):
+        content['image'] = get('image')
+    post = {
+        'title': get('title'),
+        'content': content,
+        'location': {'type': 'Point', 'coordinates': [_csv_number(get('longitude')), _csv_number(get('latitude'))]},
+        'tag': get('tag'),
+        'optionalTags': [tag.strip() for tag in get('optionalTags').split(CSV_LIST_SEPARATOR) if tag.strip()],
+    }
+    for name in ('storyPrompt', 'createdAt', 'status'):
+        if get(name):
+            post[name] = get(name)
+    return post
+
+
+def parse_csv(lines: Iterable[str]) -> Iterator[Tuple[int, object]]:
+    for row, record in enumerate(csv.DictReader(lines), start=1):
+        yield row, _csv_row_to_post(record)
+
+
+def parse_rows(text_stream, fmt: str) -> Iterator[Tuple[int, object]]:
+    if fmt == 'csv':
+        return parse_csv(text_stream)
+    return parse_ndjson(text_stream)
+
+
+def _to_document(data: dict, now: datetime.datetime) -> dict:
+    """Same stored shape as ``create`` produces."""
+    data.pop('captchaToken', None)
+    data.pop('captchaGraceToken', None)
+    created_at = data.pop('createdAt', None)
+    if created_at is not None and created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=datetime.timezone.utc)
+    data['created_at'] = created_at or now
+    data['optional_tags'] = data.pop('optionalTags', [])
+    story_prompt = data.pop('storyPrompt', None)
+    if story_prompt:
+        data['story_prompt'] = story_prompt
+    return data
+
+
+def _insert_chunk(collection, chunk: List[Tuple[int, object]], errors: List[RowError], dry_run: bool) -> int:
+    rows = [row for row, _ in chunk]
+    try:
+        loaded = bulk_post_schema.load([data for _, data in chunk])
+        invalid = {}
+    except ValidationError as err:
+        loaded, invalid = err.valid_data, err.messages
+    errors.extend(RowError(rows[index], messages) for index, messages in sorted(invalid.items()))
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    documents, document_rows = [], []
+    for index, data in enumerate(loaded):
+        if index not in invalid:
+            documents.append(_to_document(data, now))
+            document_rows.append(rows[index])
+    if not documents or dry_run:
+        return len(documents)
+
+    try:
+        return len(collection.insert_many(documents, ordered=False).inserted_ids)
+    except BulkWriteError as e:
+        # e.g. a location the 2dsphere index rejects; the other documents were still written.
+        for write_error in e.details.get('writeErrors', []):
+            errors.append(RowError(document_rows[write_error['index']], {'_row': [write_error.get('errmsg', 'Write failed')]}))
+        return e.details.get('nInserted', 0)
+
+
+def ingest_rows(collection, rows: Iterable[Tuple[int, object]], chunk_size: int = CHUNK_SIZE,
+                max_rows: Optional[int] = None, dry_run: bool = False) -> IngestResult:
+    """Validate and insert ``(row, data)`` pairs from :func:`parse_rows` in chunks of ``chunk_size``."""
+    inserted, errors, chunk = 0, [], []
+    for row, data in rows:
+        if max_rows is not None and row > max_rows:
+            errors.append(RowError(row, {'_row': [f'Import is limited to {max_rows} rows']}))
+            break
+        if isinstance(data, RowError):
+            errors.append(data)
+            continue
+        chunk.append((row, data))
+        if len(chunk) >= chunk_size:
+            inserted += _insert_chunk(collection, chunk, errors, dry_run)
+            chunk = []
+    if chunk:
+        inserted += _insert_chunk(collection, chunk, errors, dry_run)
+    return IngestResult(inserted, sorted(errors, key=lambda error: error.row))
+
+
+def detect_format(content_type: Optional[str], filename: Optional[str] = None) -> str:
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    if content_type in ('text/csv', 'application/csv') or (filename or '').lower().endswith('.csv'):
+        return 'csv'
+    return 'ndjson'
+
+
+def text_lines(binary_stream) -> io.TextIOWrapper:
+    # utf-8-sig: spreadsheet exports often start with a BOM.
+    return io.TextIOWrapper(binary_stream, encoding='utf-8-sig', newline='')
@@ -0,0 +1,198 @@
+"""In-process request, MongoDB and outbound-call metrics in the Prometheus text format.
+
+:func:`init_metrics` installs request hooks that record, per route, the request latency, the
+response size and the time spent in MongoDB commands and third-party HTTP calls during the
+request, plus listing-cache hits/misses (from the ``X-Cache`` header). :class:`MongoCommandListener`
+times every Mongo command and :func:`observe_external_call` is the ``on_complete`` hook of
+:class:`http_client.HttpClient`.
+
+Values live in the worker process: with several gunicorn workers each scrape of ``/metrics``
+reports the worker that served it.
+"""
+import threading
+import time
+from typing import Dict, Tuple
+
+from flask import g, has_request_context, request
+from pymongo import monitoring
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+    def render(self) -> list:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._render_samples(items))
+        return lines
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _render_samples(self, items) -> list:
+        return [f'{self.name}{_format_labels(self.label_names, key)} {value}' for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [per-bucket counts..., sum, count]
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def _render_samples(self, items) -> list:
+        lines = []
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                bucket_labels = _format_labels(self.label_names, key, 'le="%s"' % bound)
+                lines.append(f'{self.name}_bucket{bucket_labels} {cumulative}')
+            inf_labels = _format_labels(self.label_names, key, 'le="+Inf"')
+            lines.append(f'{self.name}_bucket{inf_labels} {state[-1]}')
+            lines.append(f'{self.name}_sum{_format_labels(self.label_names, key)} {state[-2]}')
+            lines.append(f'{self.name}_count{_format_labels(self.label_names, key)} {state[-1]}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, documentation: str, label_names: Tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, documentation, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, label_names: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, label_names, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+REQUEST_SECONDS = registry.histogram(
+    'http_request_duration_seconds', 'Time to produce the response (streamed bodies excluded)', ('method', 'route', 'status'))
+RESPONSE_BYTES = registry.histogram(
+    'http_response_size_bytes', 'Response body size after compression', ('route',), buckets=SIZE_BUCKETS)
+REQUEST_MONGO_SECONDS = registry.histogram(
+    'http_request_mongodb_seconds', 'Time spent in MongoDB commands per request', ('route',))
+REQUEST_EXTERNAL_SECONDS = registry.histogram(
+    'http_request_external_seconds', 'Time spent in third-party HTTP calls per request', ('route',))
+CACHE_LOOKUPS = registry.counter(
+    'http_cache_lookups_total', 'Response cache lookups by result (X-Cache header)', ('route', 'result'))
+MONGO_COMMAND_SECONDS = registry.histogram(
+    'mongodb_command_duration_seconds', 'MongoDB command round-trip time', ('command', 'outcome'))
+EXTERNAL_CALL_SECONDS = registry.histogram(
+    'external_request_duration_seconds', 'Third-party HTTP call time including retries', ('service', 'outcome'))
+
+
+def _add_request_time(attribute: str, seconds: float):
+    # Mongo and HTTP calls also run on background threads (image uploads) with no request.
+    if has_request_context():
+        setattr(g, attribute, getattr(g, attribute, 0.0) + seconds)
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """pymongo command monitoring; pass as ``event_listeners=[...]`` when creating the client."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event, 'ok')
+
+    def failed(self, event):
+        self._record(event, 'error')
+
+    def _record(self, event, outcome: str):
+        seconds = event.duration_micros / 1e6
+        MONGO_COMMAND_SECONDS.observe(seconds, command=event.command_name, outcome=outcome)
+        _add_request_time('_metrics_mongo_seconds', seconds)
+
+
+def observe_external_call(service: str, seconds: float, outcome: str):
+    EXTERNAL_CALL_SECONDS.observe(seconds, service=service, outcome=outcome)
+    _add_request_time('_metrics_external_seconds', seconds)
+
+
+def init_metrics(app):
+    """Register the request hooks. Call before other after_request hooks (e.g. compression) so
+    response sizes are measured on the final body."""
+
+    @app.before_request
+    def _start_request_timer():
+        g._metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _record_request_metrics(response):
+        started = g.get('_metrics_started')
+        if started is None:
+            return response
+        route = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+        REQUEST_SECONDS.observe(time.perf_counter() - started, method=request.method, route=route, status=response.status_code)
+        REQUEST_MONGO_SECONDS.observe(g.get('_metrics_mongo_seconds', 0.0), route=route)
+        REQUEST_EXTERNAL_SECONDS.observe(g.get('_metrics_external_seconds', 0.0), route=route)
+        if response.content_length is not None:
+            RESPONSE_BYTES.observe(response.content_length, route=route)
+        cache_result = response.headers.get('X-Cache')
+        if cache_result:
+            CACHE_LOOKUPS.inc(route=route, result=cache_result.lower())
+        return response
+
+
+def render_metrics() -> Tuple[str, int, Dict[str, str]]:
+    return registry.render(), 200, {'Content-Type': CONTENT_TYPE}
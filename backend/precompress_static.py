@@ -0,0 +1,51 @@
+"""Write .gz (and .br when the brotli package is installed) siblings for built static assets.
+
+Run after copying the frontend build into ``backend/static``; ``compression.send_static_file``
+serves these siblings to clients that advertise support for them.
+
+Usage: python precompress_static.py [static_dir]
+"""
+import gzip
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on build environment
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {'.html', '.js', '.mjs', '.css', '.json', '.geojson', '.svg', '.txt', '.map', '.xml'}
+MIN_SIZE = 1024
+
+
+def precompress_directory(static_dir: str) -> int:
+    written = 0
+    for root, _, files in os.walk(static_dir):
+        for name in files:
+            if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+            if len(data) < MIN_SIZE:
+                continue
+
+            variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+            if brotli is not None:
+                variants.append(('.br', brotli.compress(data, quality=11)))
+            for suffix, compressed in variants:
+                # Only keep variants that actually save bytes (and drop stale ones from older builds).
+                if len(compressed) >= len(data):
+                    if os.path.exists(path + suffix):
+                        os.remove(path + suffix)
+                    continue
+                with open(path + suffix, 'wb') as f:
+                    f.write(compressed)
+                written += 1
+    return written
+
+
+if __name__ == '__main__':
+    target = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+    count = precompress_directory(target)
+    print(f"Wrote {count} precompressed files in {target}" + ('' if brotli else ' (install brotli for .br files)'))
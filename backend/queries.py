@@ -0,0 +1,122 @@
+"""Mongo query builders for the public stories listing and the marker clusters.
+
+Kept free of Flask state so the query shapes ``get_posts`` issues can also be built outside a
+request, e.g. by ``benchmarks/explain_queries.py`` to check their plans against the indexes
+declared in ``indexes.py``.
+"""
+import math
+from typing import Optional
+
+# Keyset pagination order for GET /api/posts (newest first, _id as tie-breaker)
+POSTS_SORT = [('created_at', -1), ('_id', -1)]
+
+# Approximate parallels with short geodesic segments so the polygon edges follow lines of latitude.
+BBOX_EDGE_STEP_DEGREES = 1.0
+# Web-mercator latitude limit. A bbox edge on a pole would collapse into repeated pole vertices,
+# which MongoDB rejects, and web maps cannot show anything beyond it anyway.
+MAX_BBOX_LATITUDE = 85.05112878
+# Grid used by /api/posts/clusters: each 256px web-mercator tile at the requested zoom is split
+# into CLUSTER_CELLS_PER_TILE x CLUSTER_CELLS_PER_TILE buckets (~64px cells).
+CLUSTER_CELLS_PER_TILE = 4
+
+
+def build_post_query(tag: Optional[str] = None, optional_tags: Optional[list] = None, story_prompt: Optional[str] = None) -> dict:
+    """Base stories query for validated tag/optionalTags/storyPrompt filters."""
+    query = {'status': 'approved'}  # Only return approved posts by default
+
+    and_filters = []
+    if tag:
+        and_filters.append({'tag': tag})
+    if optional_tags:
+        and_filters.append({'optional_tags': {'$all': sorted(set(optional_tags))}})
+    if story_prompt:
+        and_filters.append({'story_prompt': story_prompt})
+
+    if len(and_filters) == 1:
+        query.update(and_filters[0])
+    elif len(and_filters) > 1:
+        query['$and'] = and_filters
+
+    return query
+
+
+def keyset_filter(cursor: list) -> dict:
+    """Select documents strictly after ``cursor`` in POSTS_SORT order (created_at desc, _id desc)."""
+    created_at, last_id = cursor
+    if created_at is None:
+        # Documents without created_at sort last; only the _id tie-breaker remains.
+        return {'created_at': None, '_id': {'$lt': last_id}}
+    return {'$or': [
+        {'created_at': {'$lt': created_at}},
+        {'created_at': created_at, '_id': {'$lt': last_id}},
+        {'created_at': None},
+    ]}
+
+
+def _wrap_longitude(lng: float) -> float:
+    return ((lng + 180.0) % 360.0) - 180.0
+
+
+def bbox_to_geometry(min_lng: float, min_lat: float, max_lng: float, max_lat: float) -> dict:
+    """Build a counter-clockwise GeoJSON polygon for a lng/lat viewport.
+
+    Leaflet may report longitudes outside [-180, 180] (world copies) or viewports wider than
+    the globe, so longitudes are unwrapped, clamped to one full turn and re-wrapped per vertex.
+    Latitudes are clamped to +/-MAX_BBOX_LATITUDE. The strict-winding CRS lets MongoDB accept
+    polygons larger than a hemisphere.
+    """
+    min_lat = max(min_lat, -MAX_BBOX_LATITUDE)
+    max_lat = min(max_lat, MAX_BBOX_LATITUDE)
+    span = min(max_lng - min_lng, 360.0 - 1e-6)
+    steps = max(1, int(span // BBOX_EDGE_STEP_DEGREES) + 1)
+    lngs = [_wrap_longitude(min_lng + span * i / steps) for i in range(steps + 1)]
+
+    ring = [[lng, min_lat] for lng in lngs]
+    ring += [[lng, max_lat] for lng in reversed(lngs)]
+    ring.append(ring[0])
+    return {
+        'type': 'Polygon',
+        'coordinates': [ring],
+        'crs': {'type': 'name', 'properties': {'name': 'urn:x-mongodb:crs:strictwinding:EPSG:4326'}},
+    }
+
+
+def build_cluster_pipeline(query: dict, zoom: int) -> list:
+    """Aggregate matching stories into web-mercator grid cells with per-tag counts."""
+    cells = float((2 ** zoom) * CLUSTER_CELLS_PER_TILE)
+    lng = {'$arrayElemAt': ['$location.coordinates', 0]}
+    # Clamp to the web-mercator latitude range so ln(tan(...)) stays finite.
+    lat = {'$max': [-MAX_BBOX_LATITUDE, {'$min': [MAX_BBOX_LATITUDE, {'$arrayElemAt': ['$location.coordinates', 1]}]}]}
+    mercator_y = {
+        '$divide': [
+            {'$ln': {'$tan': {'$add': [math.pi / 4, {'$divide': [{'$degreesToRadians': lat}, 2]}]}}},
+            math.pi,
+        ]
+    }
+    return [
+        {'$match': query},
+        {'$project': {
+            'tag': 1,
+            'lng': lng,
+            'lat': lat,
+            'x': {'$floor': {'$multiply': [{'$divide': [{'$add': [lng, 180]}, 360]}, cells]}},
+            'y': {'$floor': {'$multiply': [{'$divide': [{'$subtract': [1, mercator_y]}, 2]}, cells]}},
+        }},
+        # Skip legacy documents without usable coordinates.
+        {'$match': {'lng': {'$type': 'number'}}},
+        {'$group': {
+            '_id': {'x': '$x', 'y': '$y', 'tag': '$tag'},
+            'count': {'$sum': 1},
+            'sum_lng': {'$sum': '$lng'},
+            'sum_lat': {'$sum': '$lat'},
+            'post_id': {'$first': '$_id'},
+        }},
+        {'$group': {
+            '_id': {'x': '$_id.x', 'y': '$_id.y'},
+            'count': {'$sum': '$count'},
+            'sum_lng': {'$sum': '$sum_lng'},
+            'sum_lat': {'$sum': '$sum_lat'},
+            'tags': {'$push': {'tag': '$_id.tag', 'count': '$count'}},
+            'post_id': {'$first': '$post_id'},
+        }},
+    ]
@@ -0,0 +1,105 @@
+"""Marshmallow schemas for story documents, shared by the API routes and the bulk importer."""
+from marshmallow import Schema, ValidationError, fields, validate, validates
+
+# Define the schema for input validation using Marshmallow
+STORY_PROMPTS = [
+    'A moment that stayed with me',
+    "A change I've noticed over time",
+    "A challenge I'm facing",
+    'Something I lost',
+    "Something I'm protecting",
+    "Something I'm proud of",
+    'A solution I believe in',
+    'A question I have',
+    'Lived experience / One-time event',
+    'Personal action I took',
+    'Community action',
+    "Something I'm worried about",
+    'Something that gives me hope',
+]
+
+class PostSchema(Schema):
+    title = fields.Str(required=True)
+    content = fields.Dict(required=True)
+    location = fields.Dict(required=True)
+    tag = fields.Str(
+        required=True,
+        validate=validate.OneOf(
+            [
+                # Emotion tags
+                'Anxious',
+                'Overwhelmed',
+                'Hopeful',
+                'Empowered',
+                'Frustrated',
+                'Angry',
+                'Concerned',
+                'Sad/Grief',
+                'Motivated',
+                'Inspired',
+                'Determined',
+                'Resilient',
+                'Fearful',
+                'Curious',
+                # Legacy tags (backward compatibility)
+                'Positive',
+                'Neutral',
+                'Negative',
+            ]
+        ),
+    )
+    optionalTags = fields.List(fields.Str(), required=False, load_default=[]) # Make optional for backward compatibility
+    storyPrompt = fields.Str(required=False, allow_none=True, load_default=None, validate=validate.OneOf(STORY_PROMPTS))
+    captchaToken = fields.Str(required=False, allow_none=True, load_default=None)  # Required unless a grace token is provided
+    captchaGraceToken = fields.Str(required=False, allow_none=True, load_default=None)
+    createdAt = fields.DateTime()
+    status = fields.Str(required=False, load_default='pending')
+
+# Define a schema for tag validation
+class TagSchema(Schema):
+    tag = fields.Str(
+        required=False,
+        allow_none=True,
+        validate=validate.OneOf(
+            [
+                # Emotion tags
+                'Anxious',
+                'Overwhelmed',
+                'Hopeful',
+                'Empowered',
+                'Frustrated',
+                'Angry',
+                'Concerned',
+                'Sad/Grief',
+                'Motivated',
+                'Inspired',
+                'Determined',
+                'Resilient',
+                'Fearful',
+                'Curious',
+                # Legacy tags (backward compatibility)
+                'Positive',
+                'Neutral',
+                'Negative',
+            ]
+        ),
+    )
+    optionalTags = fields.List(fields.Str(), required=False, load_default=[])
+    storyPrompt = fields.Str(required=False, allow_none=True, validate=validate.OneOf(STORY_PROMPTS))
+
+POST_STATUSES = ['pending', 'approved', 'rejected']
+
+# Define a schema for bulk-imported stories (already moderated by the partner, no CAPTCHA)
+class BulkPostSchema(PostSchema):
+    status = fields.Str(required=False, load_default='approved', validate=validate.OneOf(POST_STATUSES))
+
+    @validates('location')
+    def validate_location(self, value, **kwargs):
+        coordinates = value.get('coordinates')
+        if value.get('type') != 'Point' or not isinstance(coordinates, list) or len(coordinates) != 2:
+            raise ValidationError('location must be a GeoJSON Point')
+        lng, lat = coordinates
+        if not all(isinstance(c, (int, float)) and not isinstance(c, bool) for c in coordinates):
+            raise ValidationError('location coordinates must be numbers')
+        if not (-180 <= lng <= 180 and -90 <= lat <= 90):
+            raise ValidationError('location coordinates are out of range')
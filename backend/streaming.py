@@ -0,0 +1,73 @@
+"""Incremental serializers for large result sets.
+
+Each generator consumes an iterable of already-normalised documents (typically a Mongo cursor
+mapped through ``export.serialize_post``) and yields encoded chunks, so only one batch is held in
+memory at a time and the first bytes reach the client before the cursor is exhausted.
+"""
+import csv
+import io
+from typing import Callable, Iterable, Iterator
+
+# Documents joined into one chunk; keeps per-chunk overhead low without buffering much.
+CHUNK_DOCUMENTS = 100
+
+
+def _batched(items: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_json_array(docs: Iterable[dict], dumps: Callable[[dict], str]) -> Iterator[bytes]:
+    """Yield a JSON array (``[doc,doc,...]``) in chunks."""
+    yield b'['
+    first = True
+    for batch in _batched(docs, CHUNK_DOCUMENTS):
+        chunk = ','.join(dumps(doc) for doc in batch)
+        yield (chunk if first else ',' + chunk).encode('utf-8')
+        first = False
+    yield b']'
+
+
+def iter_ndjson(docs: Iterable[dict], dumps: Callable[[dict], str]) -> Iterator[bytes]:
+    """Yield newline-delimited JSON, one document per line."""
+    for batch in _batched(docs, CHUNK_DOCUMENTS):
+        yield ''.join(dumps(doc) + '\n' for doc in batch).encode('utf-8')
+
+
+def iter_feature_collection(features: Iterable[dict], dumps: Callable[[dict], str]) -> Iterator[bytes]:
+    """Yield a GeoJSON FeatureCollection in chunks."""
+    yield b'{"type":"FeatureCollection","features":'
+    yield from iter_json_array(features, dumps)
+    yield b'}'
+
+
+# Leading characters spreadsheets read as a formula (OWASP "CSV injection").
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _csv_cell(value):
+    """Prefix text cells a spreadsheet would evaluate with ``'``; numbers are left as they are."""
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def iter_csv(rows: Iterable[list], header: list) -> Iterator[bytes]:
+    """Yield CSV text (header first), one chunk per batch of rows. Text cells starting with a
+    formula character are escaped (see ``_csv_cell``)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for batch in _batched(rows, CHUNK_DOCUMENTS):
+        writer.writerows([_csv_cell(value) for value in row] for row in batch)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')  # header only: no rows
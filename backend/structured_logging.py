@@ -0,0 +1,160 @@
+"""JSON logging with the write to stdout moved off the request thread.
+
+:func:`init_logging` routes the root logger through a :class:`logging.handlers.QueueHandler`;
+a :class:`logging.handlers.QueueListener` thread formats each record as one JSON object and
+writes it, so gunicorn workers do not block on (or contend for) stdout while serving requests.
+
+Every record logged during a request carries its ``request_id`` (taken from a sane incoming
+``X-Request-ID`` header or generated, and echoed on the response). Records logged with
+``extra={'sample_rate': 0.01}`` are kept with that probability, which is used for the
+per-request access log.
+"""
+import atexit
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import time
+import uuid
+
+from flask import g, has_request_context, request
+
+# Attributes every LogRecord has; anything else was passed through ``extra=``.
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'request_id', 'sample_rate'}
+_REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+# Bounded so a stalled stdout drops records instead of growing memory without limit.
+QUEUE_SIZE = 10000
+
+access_logger = logging.getLogger('access')
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if getattr(record, 'request_id', None):
+            entry['request_id'] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _RequestQueueHandler(logging.handlers.QueueHandler):
+    """Runs on the calling (request) thread: samples, tags the record and enqueues it unformatted.
+
+    Only the JSON formatting and the write happen on the listener thread.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        sample_rate = getattr(record, 'sample_rate', None)
+        if sample_rate is not None and random.random() >= sample_rate:
+            return False
+        if has_request_context():
+            record.request_id = g.get('request_id')
+        return super().filter(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve what depends on the caller's state now; JSON formatting happens on the listener.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+class _LogPipeline:
+    def __init__(self, level: int):
+        self.output = logging.StreamHandler(sys.stdout)
+        self.output.setFormatter(JsonFormatter())
+        self.handler = _RequestQueueHandler(queue.Queue(QUEUE_SIZE))
+        self.listener = None
+
+        # Added next to any handlers the host (e.g. a test runner) installed, replacing only
+        # a queue handler left by an earlier init_logging call.
+        root = logging.getLogger()
+        for handler in [h for h in root.handlers if isinstance(h, _RequestQueueHandler)]:
+            root.removeHandler(handler)
+        root.addHandler(self.handler)
+        root.setLevel(level)
+
+    def start(self):
+        self.listener = logging.handlers.QueueListener(self.handler.queue, self.output, respect_handler_level=True)
+        self.listener.start()
+
+    def restart_after_fork(self):
+        # The listener thread does not survive a fork (e.g. gunicorn --preload), and the
+        # parent's queue may have been forked with its internal locks held; start over with
+        # an empty queue and a new listener.
+        self.handler.queue = queue.Queue(QUEUE_SIZE)
+        self.start()
+
+    def stop(self):
+        if self.listener is not None:
+            self.listener.stop()  # flushes queued records
+            self.listener = None
+
+
+def _parse_level(level: str):
+    """Numeric level for a name like ``INFO``/``debug``, or None when it is not one."""
+    value = logging.getLevelName(str(level).strip().upper())
+    return value if isinstance(value, int) else None
+
+
+def init_logging(app, level: str = 'INFO', request_sample_rate: float = 0.0):
+    """Install JSON queue logging and request IDs. ``request_sample_rate`` is the share of
+    successful requests written to the access log (server errors are always logged). An
+    unknown ``level`` falls back to INFO with a warning."""
+    numeric_level = _parse_level(level)
+    pipeline = _LogPipeline(logging.INFO if numeric_level is None else numeric_level)
+    pipeline.start()
+    atexit.register(pipeline.stop)
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=pipeline.restart_after_fork)
+    if numeric_level is None:
+        logging.getLogger(__name__).warning('Unknown log level %r; using INFO', level)
+
+    @app.before_request
+    def _assign_request_id():
+        incoming = request.headers.get('X-Request-ID', '')
+        g.request_id = incoming if _REQUEST_ID_PATTERN.match(incoming) else uuid.uuid4().hex
+        g._log_started = time.perf_counter()
+
+    @app.after_request
+    def _log_request(response):
+        request_id = g.get('request_id')
+        if request_id:
+            response.headers['X-Request-ID'] = request_id
+        started = g.get('_log_started')
+        if started is not None:
+            fields = {
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+            }
+            if response.status_code >= 500:
+                access_logger.error('request', extra=fields)
+            elif request_sample_rate > 0:
+                access_logger.info('request', extra=dict(fields, sample_rate=request_sample_rate))
+        return response
+
+    return pipeline
@@ -0,0 +1,151 @@
+"""RedisBackend against an in-memory stand-in for the ``redis`` package."""
+import sys
+import types
+
+import pytest
+
+import cache
+from cache import CacheUnavailable, RedisBackend, create_backend
+
+
+class FakeRedisError(Exception):
+    pass
+
+
+class FakeRedis:
+    """The subset of ``redis.Redis`` RedisBackend uses, with a settable clock and an outage switch."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.down = False
+        self._data = {}
+        self._expires = {}
+
+    @classmethod
+    def from_url(cls, url):
+        return cls()
+
+    def _check(self):
+        if self.down:
+            raise FakeRedisError('Connection refused')
+
+    def _live(self, key):
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at <= self.now:
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return self._data.get(key)
+
+    def get(self, key):
+        self._check()
+        return self._live(key)
+
+    def set(self, key, value, ex=None):
+        self._check()
+        self._data[key] = value
+        self._expires.pop(key, None)
+        if ex is not None:
+            self._expires[key] = self.now + ex
+
+    def delete(self, key):
+        self._check()
+        self._data.pop(key, None)
+        self._expires.pop(key, None)
+
+    def getdel(self, key):
+        self._check()
+        value = self._live(key)
+        self.delete(key)
+        return value
+
+    def incr(self, key):
+        self._check()
+        value = int(self._live(key) or 0) + 1
+        self._data[key] = str(value).encode('ascii')
+        return value
+
+    def expire(self, key, seconds):
+        self._check()
+        self._expires[key] = self.now + seconds
+
+
+@pytest.fixture(autouse=True)
+def fake_redis_module(monkeypatch):
+    module = types.ModuleType('redis')
+    module.Redis = FakeRedis
+    module.RedisError = FakeRedisError
+    monkeypatch.setitem(sys.modules, 'redis', module)
+
+
+def test_create_backend_selects_redis():
+    assert isinstance(create_backend('redis://localhost:6379/0'), RedisBackend)
+
+
+def test_get_set_delete_pop():
+    backend = RedisBackend('redis://localhost:6379/0')
+    assert backend.get('k') is None
+    backend.set('k', b'v')
+    assert backend.get('k') == b'v'
+    backend.delete('k')
+    assert backend.get('k') is None
+    backend.set('k', b'v')
+    assert backend.pop('k') == b'v'
+    assert backend.pop('k') is None
+
+
+def test_set_ttl_expires():
+    backend = RedisBackend('redis://localhost:6379/0')
+    backend.set('short', b'v', ttl_seconds=10)
+    backend.set('forever', b'v', ttl_seconds=0)
+    backend._client.now += 11
+    assert backend.get('short') is None
+    assert backend.get('forever') == b'v'
+
+
+def test_incr_sets_ttl_on_create_only():
+    backend = RedisBackend('redis://localhost:6379/0')
+    assert backend.incr('hits', ttl_seconds=60) == 1
+    backend._client.now += 30
+    assert backend.incr('hits', ttl_seconds=60) == 2
+    backend._client.now += 31  # the window started at the first hit, not the last
+    assert backend.get('hits') is None
+    assert backend.incr('hits', ttl_seconds=60) == 1
+
+
+def test_outage_is_a_miss_but_incr_raises(caplog):
+    backend = RedisBackend('redis://localhost:6379/0')
+    backend.set('k', b'v')
+    backend._client.down = True
+    assert backend.get('k') is None
+    assert backend.pop('k') is None
+    backend.set('k', b'w')
+    backend.delete('k')
+    assert 'Cache get failed' in caplog.text
+    with pytest.raises(CacheUnavailable):
+        backend.incr('hits', ttl_seconds=60)
+
+
+@pytest.mark.parametrize('call', [
+    lambda backend: backend.get('k'),
+    lambda backend: backend.set('k', b'v', ttl_seconds=60),
+    lambda backend: backend.delete('k'),
+    lambda backend: backend.pop('k'),
+    lambda backend: backend.incr('k', ttl_seconds=60),
+])
+def test_strict_backend_fails_closed(call):
+    backend = create_backend('redis://localhost:6379/0', strict=True)
+    backend._client.down = True
+    with pytest.raises(CacheUnavailable):
+        call(backend)
+
+
+def test_response_cache_invalidate_survives_outage():
+    backend = RedisBackend('redis://localhost:6379/0')
+    posts = cache.ResponseCache(backend, 'posts', ttl_seconds=60)
+    key = posts.key_for('/api/posts')
+    posts.set(key, b'[]')
+    assert posts.get(key) == b'[]'
+    posts.invalidate()
+    assert posts.get(posts.key_for('/api/posts')) is None
+    backend._client.down = True
+    posts.invalidate()  # logged, not raised
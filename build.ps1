@@ -29,4 +29,12 @@ New-Item -ItemType Directory -Force -Path $backendStatic | Out-Null
 Write-Host 'Copying frontend build to backend\static...' -ForegroundColor Cyan
 Copy-Item -Path (Join-Path $distPath '*') -Destination $backendStatic -Recurse -Force
 
+# Write .gz/.br siblings so Flask can serve precompressed assets (canada.geojson, JS, CSS)
+Write-Host 'Precompressing static assets...' -ForegroundColor Cyan
+python (Join-Path $repoRoot 'backend\precompress_static.py') $backendStatic
+
+# Pre-generate the simplified Canada outline for every zoom level served by /api/boundary/canada
+Write-Host 'Simplifying Canada boundary...' -ForegroundColor Cyan
+python (Join-Path $repoRoot 'backend\boundary.py') (Join-Path $backendStatic 'canada.geojson')
+
 Write-Host 'Build and copy complete!' -ForegroundColor Green
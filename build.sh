@@ -22,4 +22,12 @@ else
     exit 1
 fi
 
+# Write .gz/.br siblings so Flask can serve precompressed assets (canada.geojson, JS, CSS)
+echo "Precompressing static assets..."
+python3 ../backend/precompress_static.py ../backend/static
+
+# Pre-generate the simplified Canada outline for every zoom level served by /api/boundary/canada
+echo "Simplifying Canada boundary..."
+python3 ../backend/boundary.py ../backend/static/canada.geojson
+
 echo "Build and copy complete!"
\ No newline at end of file
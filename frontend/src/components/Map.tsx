@@ -19,6 +19,9 @@ import TopicMarkerIcon from './markers/TopicMarkerIcon';
 // Replace this with your actual Mapbox access token
 const MAPBOX_TOKEN = import.meta.env.VITE_MAPBOX_ACCESS_TOKEN;
 const MONOCHROME_MAP = import.meta.env.VITE_MONOCHROME_MAP;
+// The outline only backs the inside-Canada click check; past zoom 6 (about 1 km of error)
+// each extra level roughly doubles the download without changing any realistic click.
+const MAX_BOUNDARY_ZOOM = 6;
 
 interface MapProps {
   posts: Post[];
@@ -31,6 +34,7 @@ interface MapProps {
 
 const CRCMap: React.FC<MapProps> = ({ posts, onMapClick, onMapRightClick, taskbarVisible = true, isCreatePostMode = false }) => {
   const [canadaGeoJSON, setCanadaGeoJSON] = useState<any | null>(null);
+  const [boundaryZoom, setBoundaryZoom] = useState(4);
   const [viewState, setViewState] = useState({
     longitude: -96.8283,  // Center of Canada
     latitude: 62.3947,
@@ -262,12 +266,31 @@ const CRCMap: React.FC<MapProps> = ({ posts, onMapClick, onMapRightClick, taskba
     });
   }, [posts]);
 
+  // Load a coarser outline first and fetch more detail only once the user zooms in.
   useEffect(() => {
-    fetch('/canada.geojson')
-      .then((res) => res.json())
-      .then((data) => setCanadaGeoJSON(data))
+    const wantedZoom = Math.min(MAX_BOUNDARY_ZOOM, Math.max(4, Math.floor(viewState.zoom / 2) * 2));
+    if (wantedZoom > boundaryZoom) {
+      setBoundaryZoom(wantedZoom);
+    }
+  }, [viewState.zoom, boundaryZoom]);
+
+  useEffect(() => {
+    let cancelled = false;
+    fetch(`/api/boundary/canada?zoom=${boundaryZoom}`)
+      .then((res) => {
+        if (!res.ok) throw new Error(`Boundary request failed: ${res.status}`);
+        return res.json();
+      })
+      // Fall back to the full-resolution file bundled with the frontend.
+      .catch(() => fetch('/canada.geojson').then((res) => res.json()))
+      .then((data) => {
+        if (!cancelled) setCanadaGeoJSON(data);
+      })
       .catch((err) => console.error('Failed to load GeoJSON', String(err).replace(/[\r\n\t]/g, ' ')));
-  }, []);
+    return () => {
+      cancelled = true;
+    };
+  }, [boundaryZoom]);
 
   useEffect(() => {
     if (mapRef.current) {
@@ -568,7 +591,7 @@ const CRCMap: React.FC<MapProps> = ({ posts, onMapClick, onMapRightClick, taskba
                 <p className="map-popup-description">{popupInfo.content.description}</p>
                 {popupInfo.content.image && (
                   <img 
-                    src={popupInfo.content.image} 
+                    src={popupInfo.content.thumbnail || popupInfo.content.image} 
                     alt={popupInfo.title} 
                     className="map-popup-image" 
                     onClick={() => {
@@ -34,7 +34,7 @@ const PostList: React.FC<PostListProps> = ({ posts }) => {
                 <div className="post-image">
                   {post.content.image && (
                     <img 
-                      src={post.content.image} 
+                      src={post.content.thumbnail || post.content.image} 
                       alt={post.title} 
                       onClick={() => {
                         setModalImageSrc(post.content.image!);
@@ -8,6 +8,7 @@ export interface Location {
 export interface PostContent {
   description: string;
   image?: string;
+  thumbnail?: string;
 }
 
 export interface Post {